@@ -18,6 +18,16 @@ from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
 
+# orjson encodes large tool results (price histories, option chains) several times
+# faster than the stdlib encoder and handles NumPy scalars natively
+try:
+    import orjson  # type: ignore  # noqa: F401
+    from fastapi.responses import ORJSONResponse as DefaultResponse
+    _orjson_available = True
+except ImportError:
+    from fastapi.responses import JSONResponse as DefaultResponse
+    _orjson_available = False
+
 # Import the MCP server instance and all tool definitions
 from investor_agent import server
 mcp = server.mcp
@@ -34,7 +44,8 @@ logging.basicConfig(
 app = FastAPI(
     title="Investor Agent MCP Bridge",
     description="HTTP REST API bridge for the Investor Agent MCP Server",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=DefaultResponse
 )
 
 # Add CORS middleware for n8n and web access
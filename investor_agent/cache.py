@@ -0,0 +1,174 @@
+"""
+In-process caching helpers for the investor-agent tools.
+
+Market data endpoints are slow and rate limited, while MCP clients tend to call
+several tools on the same symbol in quick succession. These helpers let the tool
+layer memoize side-effect-free fetches for a bounded amount of time.
+"""
+
+import datetime
+import functools
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable
+
+# Optional persistent layer shared across restarts and worker processes
+try:
+    import diskcache  # type: ignore
+    _diskcache_available = True
+except ImportError:
+    _diskcache_available = False
+
+logger = logging.getLogger(__name__)
+
+DISK_CACHE_DIR = os.getenv(
+    "INVESTOR_AGENT_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "investor-agent")
+)
+
+_disk_cache = None
+_disk_cache_lock = threading.Lock()
+
+
+def get_disk_cache():
+    """
+    Get the shared on-disk cache, opening it on first use.
+
+    Returns None when diskcache is not installed, when INVESTOR_AGENT_CACHE_DIR is set
+    to an empty string, or when the directory cannot be opened.
+    """
+    global _disk_cache
+    if not _diskcache_available or not DISK_CACHE_DIR:
+        return None
+    with _disk_cache_lock:
+        if _disk_cache is None:
+            try:
+                _disk_cache = diskcache.Cache(DISK_CACHE_DIR)
+            except Exception as e:
+                logger.warning(f"Disk cache unavailable at {DISK_CACHE_DIR}: {e}")
+                return None
+        return _disk_cache
+
+
+class TTLCache:
+    """
+    Bounded, thread-safe mapping whose entries expire ``ttl`` seconds after being set.
+
+    Once ``maxsize`` is exceeded the least recently used entry is evicted. A missing
+    or expired key reads as None, so None itself is never worth storing.
+    """
+
+    def __init__(self, maxsize: int = 128, ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[Any, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any) -> Any:
+        """Return the live value for ``key``, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: Any, value: Any) -> None:
+        """Store ``value`` under ``key`` for ``ttl`` seconds."""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def ttl_cache(maxsize: int = 128, ttl: float = 300.0, disk_ttl: float | None = None) -> Callable:
+    """
+    Memoize a function's results for ``ttl`` seconds in a ``TTLCache``.
+
+    The cache is keyed by the positional and keyword arguments and is safe to share
+    between threads. Exceptions and None results are never served from the cache.
+
+    With ``disk_ttl`` set and diskcache installed, results are also persisted for
+    ``disk_ttl`` seconds so a restarted server (or another worker) starts warm.
+    Values must be picklable.
+
+    The wrapped function gains ``cache_get(*args, **kwargs)`` (returns the live
+    cached value or None without calling the function), ``cache_set(value, *args,
+    **kwargs)`` (stores a value fetched by other means, e.g. a batch request) and
+    ``cache_clear()``.
+    """
+    def decorator(func: Callable) -> Callable:
+        cache = TTLCache(maxsize, ttl)
+
+        def make_key(args: tuple, kwargs: dict) -> Any:
+            return (args, tuple(sorted(kwargs.items()))) if kwargs else args
+
+        def disk_get(key: Any) -> Any:
+            disk = get_disk_cache() if disk_ttl else None
+            if disk is None:
+                return None
+            try:
+                value = disk.get((func.__module__, func.__qualname__, key))
+            except Exception as e:
+                logger.warning(f"Disk cache read failed for {func.__qualname__}: {e}")
+                return None
+            if value is not None:
+                cache.set(key, value)
+            return value
+
+        def disk_set(key: Any, value: Any) -> None:
+            disk = get_disk_cache() if disk_ttl else None
+            if disk is None or value is None:
+                return
+            try:
+                disk.set((func.__module__, func.__qualname__, key), value, expire=disk_ttl)
+            except Exception as e:
+                logger.warning(f"Disk cache write failed for {func.__qualname__}: {e}")
+
+        def cache_get(*args, **kwargs) -> Any:
+            key = make_key(args, kwargs)
+            value = cache.get(key)
+            return value if value is not None else disk_get(key)
+
+        def cache_set(value: Any, *args, **kwargs) -> None:
+            key = make_key(args, kwargs)
+            cache.set(key, value)
+            disk_set(key, value)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            value = cache_get(*args, **kwargs)
+            if value is not None:
+                return value
+
+            value = func(*args, **kwargs)
+            cache_set(value, *args, **kwargs)
+            return value
+
+        wrapper.cache_get = cache_get
+        wrapper.cache_set = cache_set
+        wrapper.cache_clear = cache.clear
+        return wrapper
+
+    return decorator
+
+
+@functools.lru_cache(maxsize=1)
+def _today_iso_bucket(minute: int) -> str:
+    return datetime.date.today().isoformat()
+
+
+def today_iso() -> str:
+    """Today's local date as YYYY-MM-DD, recomputed at most once a minute."""
+    return _today_iso_bucket(int(time.time() // 60))
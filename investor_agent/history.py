@@ -0,0 +1,107 @@
+"""
+Cached yfinance price history shared by the MCP tools and the bootstrap analyses.
+
+Every daily history request, single or batched, goes through one cache so a ticker
+is downloaded once whichever tool asks for it first.
+"""
+
+import logging
+
+import pandas as pd
+import yfinance as yf
+from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception, after_log
+from yfinance.exceptions import YFRateLimitError
+
+from .cache import ttl_cache
+
+logger = logging.getLogger(__name__)
+
+# Unified retry decorator for API calls (yfinance and HTTP)
+def api_retry(func):
+    return retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=2.0, min=2.0, max=30.0),
+        retry=retry_if_exception(lambda e:
+            isinstance(e, YFRateLimitError) or
+            (hasattr(e, 'status_code') and getattr(e, 'status_code', 0) >= 500) or
+            any(term in str(e).lower() for term in [
+                "rate limit", "too many requests", "temporarily blocked",
+                "timeout", "connection", "network", "temporary", "5", "429", "502", "503", "504"
+            ])
+        ),
+        after=after_log(logger, logging.WARNING)
+    )(func)
+
+@api_retry
+def yf_call(ticker: str, method: str, *args, **kwargs):
+    """Generic yfinance API call with retry logic."""
+    t = yf.Ticker(ticker)
+    return getattr(t, method)(*args, **kwargs)
+
+# Daily history is downloaded once per ticker at the longest period the technical
+# tools accept; shorter periods are sliced from that superset in memory.
+HISTORY_SUPERSET_PERIOD = "2y"
+HISTORY_PERIOD_OFFSETS = {
+    "1mo": pd.DateOffset(months=1), "3mo": pd.DateOffset(months=3),
+    "6mo": pd.DateOffset(months=6), "1y": pd.DateOffset(years=1),
+    "2y": pd.DateOffset(years=2)
+}
+
+@ttl_cache(maxsize=512, ttl=300, disk_ttl=900)
+def _fetch_history(ticker: str, period: str, interval: str) -> pd.DataFrame:
+    """Price history, as yfinance returns it, cached for 5 minutes in memory and 15 minutes on disk."""
+    return yf_call(ticker, "history", period=period, interval=interval)
+
+def get_history(ticker: str, period: str, interval: str = "1d") -> pd.DataFrame:
+    """Get price history, slicing daily periods from a shared cached superset. Treat the result as read-only."""
+    offset = HISTORY_PERIOD_OFFSETS.get(period)
+    if interval != "1d" or offset is None:
+        return _fetch_history(ticker, period, interval)
+
+    history = _fetch_history(ticker, HISTORY_SUPERSET_PERIOD, interval)
+    if history is None or history.empty:
+        return history
+
+    cutoff = pd.Timestamp.now(tz=history.index.tz).normalize() - offset
+    return history.loc[history.index >= cutoff]
+
+@api_retry
+def yf_download(tickers: list[str], period: str, interval: str = "1d") -> pd.DataFrame:
+    """Batched, threaded yfinance download with retry logic, grouped by ticker."""
+    # ignore_tz=False keeps the exchange-local index that Ticker.history returns, so frames
+    # cached from a batch look the same as individually fetched ones
+    return yf.download(tickers, period=period, interval=interval, group_by="ticker",
+                       threads=True, progress=False, auto_adjust=True, ignore_tz=False)
+
+def get_histories(tickers: list[str], period: str) -> dict[str, pd.DataFrame]:
+    """
+    Get daily history for many tickers, fetching all cache misses in one batched download.
+
+    Tickers that fail or come back empty are left out of the result.
+    """
+    missing = [t for t in dict.fromkeys(tickers) if _fetch_history.cache_get(t, HISTORY_SUPERSET_PERIOD, "1d") is None]
+    if len(missing) > 1:
+        try:
+            bulk = yf_download(missing, HISTORY_SUPERSET_PERIOD)
+        except Exception as e:
+            logger.warning(f"Batch download failed, falling back to per-ticker fetches: {e}")
+            bulk = pd.DataFrame()
+
+        if not bulk.empty:
+            downloaded = set(bulk.columns.get_level_values(0))
+            for ticker in missing:
+                if ticker in downloaded:
+                    frame = bulk[ticker].dropna(how="all")
+                    if not frame.empty:
+                        _fetch_history.cache_set(frame, ticker, HISTORY_SUPERSET_PERIOD, "1d")
+
+    # Tickers absent from the batch result fall back to an individual fetch
+    histories = {}
+    for ticker in tickers:
+        try:
+            history = get_history(ticker, period)
+            if history is not None and not history.empty:
+                histories[ticker] = history
+        except Exception as e:
+            logger.warning(f"Failed to fetch data for {ticker}: {e}")
+    return histories
@@ -8,8 +8,12 @@ error handling, logging, and retry logic consistent with the investor-agent patt
 import logging
 import os
 import sys
-from typing import Any, Dict, List, Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
 
+import httpx
 from questrade_api import Questrade
 from tenacity import (
     retry,
@@ -18,6 +22,15 @@ from tenacity import (
     wait_exponential,
 )
 
+from .cache import TTLCache
+
+# HTTP/2 lets concurrent requests share one TLS connection; needs the h2 package
+try:
+    import h2  # type: ignore  # noqa: F401
+    _h2_available = True
+except ImportError:
+    _h2_available = False
+
 # Set up logging
 logger = logging.getLogger(__name__)
 logging.basicConfig(
@@ -27,6 +40,53 @@ logging.basicConfig(
 )
 
 
+# Shared pool for fanning out independent, blocking API requests
+_io_pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix="questrade-io")
+REQUEST_TIMEOUT = 20
+
+# Transient statuses retried with exponential backoff before the error body is returned
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+MAX_STATUS_RETRIES = 3
+
+# Idle connections are dropped by Questrade's edge after tens of seconds; a cheap ping
+# keeps the pooled connection open while the client is in use, but not indefinitely
+KEEPALIVE_INTERVAL = 25
+KEEPALIVE_IDLE_LIMIT = 300
+
+# Seconds a successful read-only response is reused: the account list rarely changes,
+# positions and balances move with the market so they are only de-duplicated briefly
+RESPONSE_TTLS = {
+    'Accounts': 3600,
+    'AccountPositions': 10,
+    'AccountBalances': 10,
+}
+
+
+def _create_session() -> httpx.Client:
+    """
+    Create the HTTP client used for all Questrade API requests.
+
+    questrade_api opens a fresh urllib connection (TCP + TLS handshake) per request;
+    a pooled keep-alive client lets consecutive tool calls reuse connections. With h2
+    installed the connection speaks HTTP/2, so the parallel requests fanned out on
+    _io_pool are multiplexed over a single TLS session.
+    """
+    transport = httpx.HTTPTransport(
+        http2=_h2_available,
+        limits=httpx.Limits(max_keepalive_connections=40, max_connections=100),
+        retries=3,  # Connection failures only; statuses are retried in QuestradeClient._get
+    )
+    return httpx.Client(transport=transport, timeout=REQUEST_TIMEOUT)
+
+
+def _is_auth_error(response: Any) -> bool:
+    """Check whether an API response is Questrade's error body for a rejected access token."""
+    if not isinstance(response, dict) or 'code' not in response:
+        return False
+    message = str(response.get('message', '')).lower()
+    return 'token' in message or 'authoriz' in message
+
+
 class QuestradeClient:
     """
     Client for interacting with the Questrade API.
@@ -35,6 +95,7 @@ class QuestradeClient:
     - Retrieve account information
     - Get account positions (assets)
     - Get account balances (cash)
+    - Get positions and balances for several accounts at once
 
     Authentication is handled via a refresh token stored in environment variables.
     """
@@ -58,6 +119,16 @@ class QuestradeClient:
             )
 
         self._client: Optional[Questrade] = None
+        self._lock = threading.Lock()
+        # questrade_api refreshes the access token (spending the single-use refresh token and
+        # rewriting its token file) on read, so concurrent reads must not race each other
+        self._token_lock = threading.Lock()
+        self._session = _create_session()
+        self._last_used = 0.0
+        self._keepalive_thread: Optional[threading.Thread] = None
+        self._responses = {
+            endpoint: TTLCache(maxsize=256, ttl=ttl) for endpoint, ttl in RESPONSE_TTLS.items()
+        }
         logger.info("QuestradeClient initialized")
 
     def _get_client(self) -> Questrade:
@@ -67,14 +138,125 @@ class QuestradeClient:
         Returns:
             Questrade: The initialized Questrade API client.
         """
-        if self._client is None:
+        with self._lock:
+            if self._client is None:
+                try:
+                    self._client = Questrade(refresh_token=self.refresh_token)
+                    logger.info("Questrade API client connected")
+                except Exception as e:
+                    logger.error(f"Failed to initialize Questrade client: {e}")
+                    raise ValueError(f"Failed to connect to Questrade API: {str(e)}")
+            return self._client
+
+    def _reconnect(self, stale: Questrade) -> Questrade:
+        """
+        Replace a client whose access token was rejected.
+
+        Questrade refresh tokens are single-use, so re-authentication uses the most
+        recent refresh token the library received rather than the one from the environment.
+        """
+        with self._lock:
+            if self._client is stale:
+                token_data = getattr(stale.auth, 'token_data', None) or {}
+                self.refresh_token = token_data.get('refresh_token', self.refresh_token)
+                self._client = None
+        return self._get_client()
+
+    def _access_token(self, client: Questrade) -> Dict[str, Any]:
+        """
+        Snapshot of the client's valid token data, refreshed by questrade_api if near expiry.
+
+        Every token read goes through here so that the I/O pool threads and the keepalive
+        ping never refresh the token at the same time.
+        """
+        with self._token_lock:
+            return client.auth.token
+
+    def _get(self, client: Questrade, endpoint: str, *path_args: Any, **params: Any) -> Any:
+        """
+        GET an API endpoint over the pooled HTTP client.
+
+        The questrade_api client still owns the endpoint paths and token refresh; only
+        the transport is replaced. Error bodies are returned as decoded JSON, matching
+        questrade_api, so callers can inspect their 'code'. Successful responses from
+        endpoints listed in RESPONSE_TTLS are reused for their TTL; treat them as read-only.
+
+        Args:
+            client: The authenticated Questrade API client.
+            endpoint: Key of the endpoint in the questrade_api config (e.g. 'AccountPositions').
+            *path_args: Values substituted into the endpoint path.
+            **params: Query string parameters.
+        """
+        cache = self._responses.get(endpoint)
+        cache_key = (path_args, tuple(sorted(params.items())))
+        if cache is not None:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        token = self._access_token(client)
+        url = (token['api_server'] + client.config['Settings']['Version'] +
+               client.config['API'][endpoint].format(*path_args))
+        headers = {'Authorization': f"{token['token_type']} {token['access_token']}"}
+        self._last_used = time.monotonic()
+        for attempt in range(MAX_STATUS_RETRIES + 1):
+            response = self._session.get(url, params=params or None, headers=headers)
+            if response.status_code not in RETRY_STATUSES or attempt == MAX_STATUS_RETRIES:
+                break
+            time.sleep(0.3 * 2 ** attempt)
+        # The final error body is handed back like questrade_api does
+        result = response.json()
+
+        # Error bodies are never cached so the next call retries (and may re-authenticate)
+        if cache is not None and not (isinstance(result, dict) and 'code' in result):
+            cache.set(cache_key, result)
+        return result
+
+    def start_keepalive(self) -> None:
+        """Start the background thread that keeps the API connection warm (once)."""
+        with self._lock:
+            if self._keepalive_thread is None:
+                self._keepalive_thread = threading.Thread(
+                    target=self._keepalive, name="questrade-keepalive", daemon=True
+                )
+                self._keepalive_thread.start()
+
+    def _keepalive(self) -> None:
+        """
+        Ping the cheap server time endpoint every KEEPALIVE_INTERVAL seconds.
+
+        Pings only go out while an authenticated client exists and a request was made
+        in the last KEEPALIVE_IDLE_LIMIT seconds, so an unused server stays quiet.
+        """
+        while True:
+            time.sleep(KEEPALIVE_INTERVAL)
+            client = self._client
+            if client is None or time.monotonic() - self._last_used > KEEPALIVE_IDLE_LIMIT:
+                continue
             try:
-                self._client = Questrade(refresh_token=self.refresh_token)
-                logger.info("Questrade API client connected")
+                # Bypass _get so the ping does not count as activity; a ping close to expiry
+                # refreshes the token, under the same lock as the tool requests
+                token = self._access_token(client)
+                self._session.get(
+                    token['api_server'] + client.config['Settings']['Version'] + client.config['API']['Time'],
+                    headers={'Authorization': f"{token['token_type']} {token['access_token']}"},
+                )
             except Exception as e:
-                logger.error(f"Failed to initialize Questrade client: {e}")
-                raise ValueError(f"Failed to connect to Questrade API: {str(e)}")
-        return self._client
+                logger.debug(f"Questrade keepalive ping failed: {e}")
+
+    def _call(self, request: Callable[[Questrade], Any]) -> Any:
+        """
+        Run a request against the shared API client, re-authenticating once on a rejected token.
+
+        Args:
+            request: Function taking the Questrade API client and returning its response.
+        """
+        client = self._get_client()
+        response = request(client)
+        if _is_auth_error(response):
+            logger.warning(f"Questrade rejected the access token ({response.get('message')}), re-authenticating")
+            response = request(self._reconnect(client))
+        return response
 
     @retry(
         retry=retry_if_exception_type((ConnectionError, TimeoutError)),
@@ -105,9 +287,8 @@ class QuestradeClient:
             ValueError: If API call fails or returns invalid data.
         """
         try:
-            client = self._get_client()
             logger.info("Fetching Questrade accounts")
-            accounts = client.accounts
+            accounts = self._call(lambda client: self._get(client, 'Accounts'))
 
             if not accounts or 'accounts' not in accounts:
                 raise ValueError("No accounts data returned from Questrade API")
@@ -159,9 +340,8 @@ class QuestradeClient:
             raise ValueError("account_number is required")
 
         try:
-            client = self._get_client()
             logger.info(f"Fetching positions for account {account_number}")
-            positions = client.account_positions(account_number)
+            positions = self._call(lambda client: self._get(client, 'AccountPositions', account_number))
 
             if positions is None:
                 raise ValueError(f"No positions data returned for account {account_number}")
@@ -228,14 +408,15 @@ class QuestradeClient:
             raise ValueError("account_number is required")
 
         try:
-            client = self._get_client()
             logger.info(f"Fetching balances for account {account_number}")
 
             # Call with start_time if provided
             if start_time:
-                balances = client.account_balances(account_number, start_time)
+                balances = self._call(
+                    lambda client: self._get(client, 'AccountBalances', account_number, startTime=start_time)
+                )
             else:
-                balances = client.account_balances(account_number)
+                balances = self._call(lambda client: self._get(client, 'AccountBalances', account_number))
 
             if balances is None:
                 raise ValueError(f"No balance data returned for account {account_number}")
@@ -248,8 +429,64 @@ class QuestradeClient:
             raise ValueError(f"Failed to retrieve balances for account {account_number}: {str(e)}")
 
 
-# Singleton instance
+    def get_portfolio(self, account_numbers: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Retrieve positions and balances for several accounts concurrently.
+
+        The positions and balances requests for every account are independent, so they
+        run in parallel and the total latency is roughly that of the slowest request.
+
+        Args:
+            account_numbers: Accounts to include. Defaults to all accounts of the user.
+
+        Returns:
+            dict: Portfolio information with structure:
+                {
+                    'accounts': [
+                        {
+                            'number': '123456',
+                            'positions': [...],
+                            'balances': {...}
+                        },
+                        ...
+                    ]
+                }
+            An account whose requests failed carries an 'error' message instead.
+
+        Raises:
+            ValueError: If the account list cannot be retrieved.
+        """
+        if not account_numbers:
+            accounts = self.get_accounts().get('accounts', [])
+            account_numbers = [str(account['number']) for account in accounts]
+
+        futures = {
+            number: (
+                _io_pool.submit(self.get_account_positions, number),
+                _io_pool.submit(self.get_account_balances, number),
+            )
+            for number in account_numbers
+        }
+
+        portfolio = []
+        for number, (positions_future, balances_future) in futures.items():
+            try:
+                portfolio.append({
+                    'number': number,
+                    'positions': positions_future.result(timeout=REQUEST_TIMEOUT).get('positions', []),
+                    'balances': balances_future.result(timeout=REQUEST_TIMEOUT),
+                })
+            except Exception as e:
+                logger.error(f"Error fetching portfolio for account {number}: {e}")
+                portfolio.append({'number': number, 'error': str(e)})
+
+        logger.info(f"Retrieved portfolio for {len(portfolio)} accounts")
+        return {'accounts': portfolio}
+
+
+# Singleton instance, shared by every tool call so one authenticated client is reused
 _questrade_client: Optional[QuestradeClient] = None
+_questrade_client_lock = threading.Lock()
 
 
 def get_questrade_client() -> QuestradeClient:
@@ -264,5 +501,8 @@ def get_questrade_client() -> QuestradeClient:
     """
     global _questrade_client
     if _questrade_client is None:
-        _questrade_client = QuestradeClient()
+        with _questrade_client_lock:
+            if _questrade_client is None:
+                _questrade_client = QuestradeClient()
+                _questrade_client.start_keepalive()
     return _questrade_client
@@ -3,8 +3,11 @@ load_dotenv()
 import os
 #print("KEY:", os.getenv("ALPACA_API_KEY"))
 #print("SECRET:", os.getenv("ALPACA_API_SECRET"))
+import asyncio
 import datetime
+import functools
 import logging
+import re
 import sys
 from concurrent.futures import ThreadPoolExecutor
 from io import StringIO
@@ -15,8 +18,6 @@ import httpx
 import pandas as pd
 import yfinance as yf
 from mcp.server.fastmcp import FastMCP
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception, after_log
-from yfinance.exceptions import YFRateLimitError
 
 mcp = FastMCP("Investor-Agent", dependencies=["yfinance", "pandas", "pytrends"])
 
@@ -32,6 +33,8 @@ except ImportError:
 
 # Import Questrade API (now mandatory)
 from .questrade import get_questrade_client, QuestradeClient
+from .cache import TTLCache, today_iso
+from .history import api_retry, yf_call, get_history, get_histories
 
 # Setup logging
 logger = logging.getLogger(__name__)
@@ -46,22 +49,6 @@ BROWSER_HEADERS = {
     'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
 }
 
-# Unified retry decorator for API calls (yfinance and HTTP)
-def api_retry(func):
-    return retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=2.0, min=2.0, max=30.0),
-        retry=retry_if_exception(lambda e:
-            isinstance(e, YFRateLimitError) or
-            (hasattr(e, 'status_code') and getattr(e, 'status_code', 0) >= 500) or
-            any(term in str(e).lower() for term in [
-                "rate limit", "too many requests", "temporarily blocked",
-                "timeout", "connection", "network", "temporary", "5", "429", "502", "503", "504"
-            ])
-        ),
-        after=after_log(logger, logging.WARNING)
-    )(func)
-
 # HTTP client utility
 def create_async_client(headers: dict | None = None) -> httpx.AsyncClient:
     """Create an httpx.AsyncClient with longer timeout, automatic redirect and custom headers."""
@@ -94,8 +81,22 @@ def validate_ticker(ticker: str) -> str:
         raise ValueError("Ticker symbol cannot be empty")
     return ticker
 
+# Symbols, share classes (BRK-B), exchange suffixes (0700.HK), indices (^GSPC), futures/FX (CL=F)
+_TICKER_RE = re.compile(r"[A-Z0-9.\-^=]{1,15}")
+
+def validate_tickers(tickers: list[str]) -> list[str]:
+    """Normalize a batch of tickers, dropping duplicates while preserving order."""
+    seen = {}
+    for t in tickers:
+        u = t.strip().upper()
+        if not _TICKER_RE.fullmatch(u):
+            raise ValueError(f"Invalid ticker symbol: {t!r}")
+        seen[u] = None
+    return list(seen)
+
+@functools.lru_cache(maxsize=1024)
 def validate_date(date_str: str) -> datetime.date:
-    """Validate and parse a date string in YYYY-MM-DD format."""
+    """Validate and parse a date string in YYYY-MM-DD format (memoized; dates are immutable)."""
     try:
         return datetime.datetime.strptime(date_str, '%Y-%m-%d').date()
     except ValueError:
@@ -113,11 +114,9 @@ def validate_date_range(start_str: str | None, end_str: str | None) -> None:
     if start_date and end_date and start_date > end_date:
         raise ValueError("start_date must be before or equal to end_date")
 
-@api_retry
-def yf_call(ticker: str, method: str, *args, **kwargs):
-    """Generic yfinance API call with retry logic."""
-    t = yf.Ticker(ticker)
-    return getattr(t, method)(*args, **kwargs)
+# Fan-out bounds for the multi-ticker technical tools
+MAX_SCREEN_TICKERS = 200
+MAX_COMPARE_TICKERS = 10
 
 def get_options_chain(ticker: str, expiry: str, option_type: Literal["C", "P"] | None = None) -> pd.DataFrame:
     """Get options chain with optional filtering by type."""
@@ -132,6 +131,19 @@ def get_options_chain(ticker: str, expiry: str, option_type: Literal["C", "P"] |
 
 
 
+def project(src: dict, keys: tuple[str, ...]) -> dict[str, Any]:
+    """Pick the given keys that are present in src, in the order of keys."""
+    return {key: src[key] for key in keys if key in src}
+
+# Fields of yfinance's ~150-key info dict that get_ticker_data reports
+TICKER_ESSENTIAL_FIELDS = (
+    'symbol', 'longName', 'currentPrice', 'marketCap', 'volume', 'trailingPE',
+    'forwardPE', 'dividendYield', 'beta', 'eps', 'totalRevenue', 'totalDebt',
+    'profitMargins', 'operatingMargins', 'returnOnEquity', 'returnOnAssets',
+    'revenueGrowth', 'earningsGrowth', 'bookValue', 'priceToBook',
+    'enterpriseValue', 'pegRatio', 'trailingEps', 'forwardEps'
+)
+
 def to_clean_csv(df: pd.DataFrame) -> str:
     """Clean DataFrame by removing empty columns and convert to CSV string."""
     # Chain operations more efficiently
@@ -303,18 +315,10 @@ def get_ticker_data(
         if not info:
             raise ValueError(f"No information available for {ticker}")
 
-        essential_fields = {
-            'symbol', 'longName', 'currentPrice', 'marketCap', 'volume', 'trailingPE',
-            'forwardPE', 'dividendYield', 'beta', 'eps', 'totalRevenue', 'totalDebt',
-            'profitMargins', 'operatingMargins', 'returnOnEquity', 'returnOnAssets',
-            'revenueGrowth', 'earningsGrowth', 'bookValue', 'priceToBook',
-            'enterpriseValue', 'pegRatio', 'trailingEps', 'forwardEps'
-        }
-
-        # Basic info section - convert to structured format
+        # Basic info section - project the essential fields into a structured format
         basic_info = [
             {"metric": key, "value": value.isoformat() if hasattr(value, 'isoformat') else value}
-            for key, value in info.items() if key in essential_fields
+            for key, value in project(info, TICKER_ESSENTIAL_FIELDS).items()
         ]
 
         result: dict[str, Any] = {"basic_info": basic_info}
@@ -555,10 +559,7 @@ async def get_nasdaq_earnings_calendar(
     }
 
     # Set default date if not provided or validate provided date
-    today = datetime.date.today()
-    target_date = validate_date(date) if date else today
-
-    date_str = target_date.strftime('%Y-%m-%d')
+    date_str = validate_date(date).isoformat() if date else today_iso()
     url = f"{NASDAQ_EARNINGS_URL}?date={date_str}"
 
     try:
@@ -711,9 +712,11 @@ def fetch_intraday_1h(stock: str, window: int = 200) -> str:
 # ============================================================================
 # Questrade Account Tools
 # ============================================================================
+# The Questrade client is blocking, so the tools run it in a worker thread. This keeps
+# the event loop free and lets the MCP server serve concurrent tool calls in parallel.
 
 @mcp.tool()
-def get_questrade_accounts() -> dict[str, Any]:
+async def get_questrade_accounts() -> dict[str, Any]:
     """
     Get list of all Questrade accounts for the authenticated user.
 
@@ -748,7 +751,7 @@ def get_questrade_accounts() -> dict[str, Any]:
     """
     try:
         client = get_questrade_client()
-        accounts = client.get_accounts()
+        accounts = await asyncio.to_thread(client.get_accounts)
 
         logger.info(f"Retrieved {len(accounts.get('accounts', []))} Questrade accounts")
         return accounts
@@ -758,7 +761,7 @@ def get_questrade_accounts() -> dict[str, Any]:
         raise ValueError(f"Failed to retrieve Questrade accounts: {str(e)}")
 
 @mcp.tool()
-def get_questrade_positions(account_number: str) -> dict[str, Any]:
+async def get_questrade_positions(account_number: str) -> dict[str, Any]:
     """
     Get all positions (holdings/assets) for a specific Questrade account.
 
@@ -805,7 +808,7 @@ def get_questrade_positions(account_number: str) -> dict[str, Any]:
 
     try:
         client = get_questrade_client()
-        positions = client.get_account_positions(account_number)
+        positions = await asyncio.to_thread(client.get_account_positions, account_number)
 
         position_count = len(positions.get('positions', []))
         logger.info(f"Retrieved {position_count} positions for account {account_number}")
@@ -816,7 +819,7 @@ def get_questrade_positions(account_number: str) -> dict[str, Any]:
         raise ValueError(f"Failed to retrieve positions for account {account_number}: {str(e)}")
 
 @mcp.tool()
-def get_questrade_balances(
+async def get_questrade_balances(
     account_number: str,
     start_time: str | None = None
 ) -> dict[str, Any]:
@@ -876,7 +879,7 @@ def get_questrade_balances(
 
     try:
         client = get_questrade_client()
-        balances = client.get_account_balances(account_number, start_time)
+        balances = await asyncio.to_thread(client.get_account_balances, account_number, start_time)
 
         logger.info(f"Retrieved balances for account {account_number}")
         return balances
@@ -885,6 +888,45 @@ def get_questrade_balances(
         logger.error(f"Error in get_questrade_balances for account {account_number}: {e}")
         raise ValueError(f"Failed to retrieve balances for account {account_number}: {str(e)}")
 
+@mcp.tool()
+async def get_questrade_portfolio(account_numbers: list[str] | None = None) -> dict[str, Any]:
+    """
+    Get positions and balances for several Questrade accounts in one call.
+
+    Fetches every account's positions and balances in parallel, which is much faster
+    than calling get_questrade_positions and get_questrade_balances per account.
+
+    Args:
+        account_numbers: Optional list of account numbers. Defaults to all accounts.
+
+    Returns:
+        dict: Portfolio information with structure:
+            {
+                'accounts': [
+                    {
+                        'number': '26598145',
+                        'positions': [...],   # as returned by get_questrade_positions
+                        'balances': {...}     # as returned by get_questrade_balances
+                    },
+                    ...
+                ]
+            }
+        Accounts that could not be fetched carry an 'error' message instead.
+
+    Raises:
+        ValueError: If the account list cannot be retrieved.
+
+    Note:
+        Requires QUESTRADE_REFRESH_TOKEN environment variable to be set.
+    """
+    try:
+        client = get_questrade_client()
+        return await asyncio.to_thread(client.get_portfolio, account_numbers)
+
+    except Exception as e:
+        logger.error(f"Error in get_questrade_portfolio: {e}")
+        raise ValueError(f"Failed to retrieve Questrade portfolio: {str(e)}")
+
 
 
 # Only register the technical indicator tool if TA-Lib is available
@@ -921,7 +963,8 @@ if _ta_available:
         if history is None or history.empty or 'Close' not in history.columns:
             raise ValueError(f"No valid historical data found for {ticker}")
 
-        close_prices = history['Close'].values
+        # TA-Lib works on contiguous float64; extract that once (a no-copy view for yfinance data)
+        close_prices = np.ascontiguousarray(history['Close'].to_numpy(dtype=np.float64, copy=False))
         min_required = {
             "SMA": timeperiod, "EMA": timeperiod * 2, "RSI": timeperiod + 1,
             "MACD": slowperiod + signalperiod, "BBANDS": timeperiod
@@ -985,6 +1028,28 @@ except ImportError:
 
 # Advanced Technical Analysis Tools
 if _advanced_ta_available:
+    # Indicators and patterns only change when a bar is added or updated, so repeat calls are lookups
+    _indicator_cache = TTLCache(maxsize=256, ttl=300)
+    _pattern_cache = TTLCache(maxsize=256, ttl=300)
+    
+    def history_window(ticker: str, history: pd.DataFrame) -> tuple:
+        """Identify a ticker's history window by its length, first/last bar and last close."""
+        return (ticker, len(history), history.index[0], history.index[-1], float(history['Close'].iloc[-1]))
+    
+    def comprehensive_indicators(ticker: str, history: pd.DataFrame, summary_only: bool = False) -> dict[str, Any]:
+        """Comprehensive indicators memoized per ticker window (length, first/last bar, last close).
+        
+        A summary request is served from a cached full result when one exists.
+        """
+        window = history_window(ticker, history)
+        indicators = _indicator_cache.get((window, False))
+        if indicators is None and summary_only:
+            indicators = _indicator_cache.get((window, True))
+        if indicators is None:
+            indicators = TechnicalAnalysis.calculate_comprehensive_indicators(history, summary_only=summary_only)
+            _indicator_cache.set((window, summary_only), indicators)
+        return indicators
+    
     @mcp.tool()
     def analyze_technical(
         ticker: str,
@@ -1001,11 +1066,11 @@ if _advanced_ta_available:
         """
         ticker = validate_ticker(ticker)
         
-        history = yf_call(ticker, "history", period=period, interval="1d")
+        history = get_history(ticker, period)
         if history is None or history.empty:
             raise ValueError(f"No historical data found for {ticker}")
         
-        indicators = TechnicalAnalysis.calculate_comprehensive_indicators(history)
+        indicators = comprehensive_indicators(ticker, history)
         
         return {
             "symbol": ticker,
@@ -1028,7 +1093,7 @@ if _advanced_ta_available:
         """
         ticker = validate_ticker(ticker)
         
-        history = yf_call(ticker, "history", period=lookback_period, interval="1d")
+        history = get_history(ticker, lookback_period)
         if history is None or history.empty:
             raise ValueError(f"No historical data found for {ticker}")
         
@@ -1058,19 +1123,14 @@ if _advanced_ta_available:
         
         Returns list of stocks that match ALL specified criteria.
         """
+        if len(tickers) > MAX_SCREEN_TICKERS:
+            raise ValueError(f"Maximum {MAX_SCREEN_TICKERS} tickers per screen, got {len(tickers)}")
+        
         # Validate tickers
-        tickers = [validate_ticker(t) for t in tickers]
+        tickers = validate_tickers(tickers)
         
-        # Fetch data for all stocks
-        stock_data = {}
-        for ticker in tickers:
-            try:
-                history = yf_call(ticker, "history", period="3mo", interval="1d")
-                if history is not None and not history.empty:
-                    stock_data[ticker] = history
-            except Exception as e:
-                logger.warning(f"Failed to fetch data for {ticker}: {e}")
-                continue
+        # Fetch data for all stocks in one batched download
+        stock_data = get_histories(tickers, "3mo")
         
         criteria = {
             "rsi_below": rsi_below,
@@ -1107,19 +1167,19 @@ if _advanced_ta_available:
         
         Useful for quickly comparing the technical health of multiple stocks.
         """
-        tickers = [validate_ticker(t) for t in tickers[:10]]  # Limit to 10 stocks
+        tickers = validate_tickers(tickers[:MAX_COMPARE_TICKERS])  # Slice before validating
         
-        comparisons = []
-        for ticker in tickers:
+        # Fetch all histories in one batch, then compute indicators per ticker in parallel
+        histories = get_histories(tickers, period)
+        
+        def compare_one(ticker: str) -> dict[str, Any]:
+            history = histories.get(ticker)
+            if history is None:
+                return {"symbol": ticker, "error": "No data available"}
             try:
-                history = yf_call(ticker, "history", period=period, interval="1d")
-                if history is None or history.empty:
-                    comparisons.append({"symbol": ticker, "error": "No data available"})
-                    continue
-                
-                indicators = TechnicalAnalysis.calculate_comprehensive_indicators(history)
+                indicators = comprehensive_indicators(ticker, history, summary_only=True)
                 
-                comparisons.append({
+                return {
                     "symbol": ticker,
                     "price": indicators['current_price'],
                     "rsi": indicators['rsi']['value'],
@@ -1127,9 +1187,12 @@ if _advanced_ta_available:
                     "macd_trend": indicators['macd']['trend'],
                     "ma_trend": indicators['moving_averages']['trend'],
                     "bb_position": indicators['bollinger_bands']['position']
-                })
+                }
             except Exception as e:
-                comparisons.append({"symbol": ticker, "error": str(e)})
+                return {"symbol": ticker, "error": str(e)}
+        
+        with ThreadPoolExecutor() as executor:
+            comparisons = list(executor.map(compare_one, tickers))
         
         return {
             "period": period,
@@ -1157,11 +1220,14 @@ if _advanced_ta_available:
         """
         ticker = validate_ticker(ticker)
         
-        history = yf_call(ticker, "history", period=period, interval="1d")
+        history = get_history(ticker, period)
         if history is None or history.empty:
             raise ValueError(f"No historical data found for {ticker}")
         
-        analysis = TechnicalAnalysis.calculate_trend_strength(history)
+        # Shares the memoized indicators with analyze_technical on the same window
+        analysis = TechnicalAnalysis.calculate_trend_strength(
+            history, indicators=comprehensive_indicators(ticker, history)
+        )
         
         return {
             "symbol": ticker,
@@ -1187,16 +1253,21 @@ if _advanced_ta_available:
         """
         ticker = validate_ticker(ticker)
         
-        history = yf_call(ticker, "history", period=period, interval="1d")
+        history = get_history(ticker, period)
         if history is None or history.empty:
             raise ValueError(f"No historical data found for {ticker}")
         
-        patterns = TechnicalAnalysis.detect_patterns(history)
+        # The full-history variance and window means only change with the window
+        window = history_window(ticker, history)
+        patterns = _pattern_cache.get(window)
+        if patterns is None:
+            patterns = TechnicalAnalysis.detect_patterns(history)
+            _pattern_cache.set(window, patterns)
         
         return {
             "symbol": ticker,
             "period": period,
-            "analysis_date": datetime.date.today().isoformat(),
+            "analysis_date": today_iso(),
             **patterns
         }
 
@@ -1211,7 +1282,8 @@ try:
         analyze_volume,
         analyze_volatility,
         calculate_relative_strength,
-        calculate_fundamental_scores
+        calculate_fundamental_scores,
+        calculate_fundamental_scores_batch
     )
     _bootstrap_available = True
 except ImportError:
@@ -1224,7 +1296,18 @@ if _bootstrap_available:
     def analyze_volume_tool(
         ticker: str,
         period: Literal["1mo", "3mo", "6mo", "1y", "2y"] = "3mo",
-        vwap_mode: Literal["session", "rolling", "anchored"] = "session"
+        vwap_mode: Literal["session", "rolling", "anchored"] = "session",
+        sections: list[
+            Literal[
+                "vwap",
+                "volume_profile",
+                "relative_volume",
+                "obv",
+                "accumulation_distribution",
+                "mfi",
+                "price_volume_confirmation"
+            ]
+        ] | None = None
     ) -> dict[str, Any]:
         """Comprehensive volume analysis - VWAP, Volume Profile, OBV, MFI.
         
@@ -1237,6 +1320,7 @@ if _bootstrap_available:
                 - "session": Daily session VWAP (TradingView default for daily charts)
                 - "rolling": 20-day rolling VWAP (swing trading)
                 - "anchored": VWAP from period start (position trading)
+            sections: Only compute these parts of the analysis (default: all)
         
         Returns:
         - VWAP (Volume Weighted Average Price) - calculated per selected mode
@@ -1249,17 +1333,69 @@ if _bootstrap_available:
         Use before EVERY trade to confirm the move is real.
         """
         ticker = validate_ticker(ticker)
-        return analyze_volume(ticker, period, vwap_mode)
+        return analyze_volume(ticker, period, vwap_mode, sections)
+    
+    @mcp.tool()
+    async def scan_volume_tool(
+        tickers: list[str],
+        period: Literal["1mo", "3mo", "6mo", "1y", "2y"] = "3mo",
+        vwap_mode: Literal["session", "rolling", "anchored"] = "session",
+        sections: list[
+            Literal[
+                "vwap",
+                "volume_profile",
+                "relative_volume",
+                "obv",
+                "accumulation_distribution",
+                "mfi",
+                "price_volume_confirmation"
+            ]
+        ] | None = None
+    ) -> dict[str, Any]:
+        """Run analyze_volume_tool over a watchlist concurrently.
+        
+        Args:
+            tickers: Stock ticker symbols (up to 200)
+            period: Historical period to analyze
+            vwap_mode: VWAP calculation method (see analyze_volume_tool)
+            sections: Only compute these parts of the analysis (default: all)
+        
+        Returns one volume analysis per ticker, in the order given.
+        """
+        if len(tickers) > MAX_SCREEN_TICKERS:
+            raise ValueError(f"Maximum {MAX_SCREEN_TICKERS} tickers per scan, got {len(tickers)}")
+        tickers = validate_tickers(tickers)
+        
+        # One batched download primes the shared history cache, then the analyses run in worker threads
+        await asyncio.to_thread(get_histories, tickers, period)
+        results = await asyncio.gather(*(
+            asyncio.to_thread(analyze_volume, ticker, period, vwap_mode, sections) for ticker in tickers
+        ))
+        
+        return {
+            "period": period,
+            "vwap_mode": vwap_mode,
+            "results": list(results)
+        }
     
     @mcp.tool()
     def analyze_volatility_tool(
         ticker: str,
-        period: Literal["3mo", "6mo", "1y", "2y"] = "6mo"
+        period: Literal["3mo", "6mo", "1y", "2y"] = "6mo",
+        sections: list[
+            Literal["atr", "historical_volatility", "beta", "keltner_channels", "bollinger_band_width"]
+        ] | None = None
     ) -> dict[str, Any]:
         """Advanced volatility analysis for risk management.
         
         Critical for proper stop placement and position sizing.
         
+        Args:
+            ticker: Stock ticker symbol
+            period: Historical period to analyze
+            sections: Only compute these parts of the analysis (default: all);
+                SPY is only fetched for "beta"
+        
         Returns:
         - ATR (Average True Range) - THE standard for stops
         - Historical Volatility (20-day annualized)
@@ -1269,7 +1405,7 @@ if _bootstrap_available:
         NEVER set stops without checking ATR first.
         """
         ticker = validate_ticker(ticker)
-        return analyze_volatility(ticker, period)
+        return analyze_volatility(ticker, period, sections)
     
     @mcp.tool()
     def calculate_relative_strength_tool(
@@ -1310,6 +1446,24 @@ if _bootstrap_available:
         """
         ticker = validate_ticker(ticker)
         return calculate_fundamental_scores(ticker, max_periods)
+    
+    @mcp.tool()
+    async def scan_fundamental_scores_tool(
+        tickers: list[str]
+    ) -> dict[str, Any]:
+        """Run calculate_fundamental_scores_tool over a watchlist, scoring all tickers in one pass.
+        
+        Args:
+            tickers: Stock ticker symbols (up to 200)
+        
+        Returns one fundamental score result per ticker, in the order given.
+        """
+        if len(tickers) > MAX_SCREEN_TICKERS:
+            raise ValueError(f"Maximum {MAX_SCREEN_TICKERS} tickers per scan, got {len(tickers)}")
+        tickers = validate_tickers(tickers)
+        
+        results = await asyncio.to_thread(calculate_fundamental_scores_batch, tickers)
+        return {"results": list(results.values())}
 
 
 if __name__ == "__main__":
@@ -0,0 +1,438 @@
+"""
+Compiled inner loops for the technical indicators.
+
+Numba is optional (``investor-agent[fast]``). When it is missing the kernels below
+are plain Python functions, so callers should check ``_numba_available`` and use
+their vectorized NumPy/pandas path instead.
+
+The kernels release the GIL, so the tools' thread pools (e.g. compare_technical's
+per-ticker fan-out) run them on several cores at once.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+    _numba_available = True
+except ImportError:
+    _numba_available = False
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit."""
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+
+@njit(cache=True, nogil=True)
+def sma_kernel(data: np.ndarray, period: int) -> np.ndarray:
+    """Rolling mean in O(n): add the entering value, subtract the leaving one."""
+    n = len(data)
+    out = np.full(n, np.nan)
+    total = 0.0
+    nan_count = 0
+
+    for i in range(n):
+        x = data[i]
+        if np.isnan(x):
+            nan_count += 1
+        else:
+            total += x
+
+        if i >= period:
+            old = data[i - period]
+            if np.isnan(old):
+                nan_count -= 1
+            else:
+                total -= old
+
+        if i >= period - 1 and nan_count == 0:
+            out[i] = total / period
+
+    return out
+
+
+@njit(cache=True, nogil=True)
+def ema_kernel(data: np.ndarray, period: int) -> np.ndarray:
+    """EMA recurrence ema[i] = alpha*x[i] + (1-alpha)*ema[i-1], with pandas' ewm(adjust=False) NaN rules."""
+    n = len(data)
+    out = np.empty(n)
+    if n == 0:
+        return out
+
+    alpha = 2.0 / (period + 1.0)
+    weighted = data[0]
+    out[0] = weighted
+    old_wt = 1.0
+
+    for i in range(1, n):
+        x = data[i]
+        if not np.isnan(weighted):
+            # A gap keeps decaying the old weight until the next observation
+            old_wt *= 1.0 - alpha
+            if not np.isnan(x):
+                if weighted != x:
+                    weighted = (old_wt * weighted + alpha * x) / (old_wt + alpha)
+                old_wt = 1.0
+        elif not np.isnan(x):
+            weighted = x
+        out[i] = weighted
+
+    return out
+
+
+@njit(cache=True, nogil=True)
+def ema_multi_kernel(data: np.ndarray, periods: np.ndarray) -> np.ndarray:
+    """ema_kernel for several periods in one sweep over data; row k holds periods[k]."""
+    n = len(data)
+    m = len(periods)
+    out = np.empty((m, n))
+    if n == 0:
+        return out
+
+    alphas = 2.0 / (periods + 1.0)
+    weighted = np.full(m, data[0])
+    old_wts = np.ones(m)
+    out[:, 0] = data[0]
+
+    for i in range(1, n):
+        x = data[i]
+        for k in range(m):
+            if not np.isnan(weighted[k]):
+                old_wts[k] *= 1.0 - alphas[k]
+                if not np.isnan(x):
+                    if weighted[k] != x:
+                        weighted[k] = (old_wts[k] * weighted[k] + alphas[k] * x) / (old_wts[k] + alphas[k])
+                    old_wts[k] = 1.0
+            elif not np.isnan(x):
+                weighted[k] = x
+            out[k, i] = weighted[k]
+
+    return out
+
+
+@njit(cache=True, nogil=True, error_model="numpy")
+def rsi_kernel(data: np.ndarray, period: int) -> np.ndarray:
+    """Wilder RSI, seeded from the first period+1 deltas like TechnicalIndicators.calculate_rsi."""
+    n = len(data)
+    out = np.empty(n)
+
+    up = 0.0
+    down = 0.0
+    for i in range(min(period + 1, n - 1)):
+        delta = data[i + 1] - data[i]
+        if delta >= 0:
+            up += delta
+        elif delta < 0:
+            down -= delta
+    up /= period
+    down /= period
+
+    if down == 0:
+        out[:] = 100.0
+        return out
+
+    out[:period] = 100.0 - 100.0 / (1.0 + up / down)
+
+    for i in range(period, n):
+        delta = data[i] - data[i - 1]
+        if delta > 0:
+            upval = delta
+            downval = 0.0
+        else:
+            upval = 0.0
+            downval = -delta
+
+        up = (up * (period - 1) + upval) / period
+        down = (down * (period - 1) + downval) / period
+
+        rs = up / down if down != 0 else 0.0
+        out[i] = 100.0 - 100.0 / (1.0 + rs)
+
+    return out
+
+
+@njit(cache=True, nogil=True)
+def atr_kernel(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int) -> np.ndarray:
+    """True range and its Wilder average (EMA with alpha = 1/period, adjust=False) in a single pass."""
+    n = len(close)
+    out = np.empty(n)
+    if n == 0:
+        return out
+
+    alpha = 1.0 / period
+    atr = high[0] - low[0]
+    out[0] = atr
+    old_wt = 1.0
+
+    for i in range(1, n):
+        high_low = high[i] - low[i]
+        high_close = abs(high[i] - close[i - 1])
+        low_close = abs(low[i] - close[i - 1])
+        # Like np.maximum, a missing input leaves the true range missing (max() would drop it)
+        if np.isnan(high_low) or np.isnan(high_close) or np.isnan(low_close):
+            tr = np.nan
+        else:
+            tr = max(high_low, high_close, low_close)
+
+        # Same NaN rules as ema_kernel: a gap keeps decaying the old weight
+        if not np.isnan(atr):
+            old_wt *= 1.0 - alpha
+            if not np.isnan(tr):
+                if atr != tr:
+                    atr = (old_wt * atr + alpha * tr) / (old_wt + alpha)
+                old_wt = 1.0
+        elif not np.isnan(tr):
+            atr = tr
+        out[i] = atr
+
+    return out
+
+
+@njit(cache=True, nogil=True)
+def wilder_rma_kernel(data: np.ndarray, period: int, seed: float) -> np.ndarray:
+    """Wilder's RMA seeded at bar period: out[i] = (out[i-1]*(period-1) + data[i]) / period, NaN before it."""
+    n = len(data)
+    out = np.full(n, np.nan)
+    if n <= period:
+        return out
+
+    rma = seed
+    out[period] = rma
+    for i in range(period + 1, n):
+        rma = (rma * (period - 1) + data[i]) / period
+        out[i] = rma
+
+    return out
+
+
+# Column layout of fundamental_scores_kernel's input rows and metrics output
+FUNDAMENTAL_COLUMNS = (
+    "net_income", "prev_net_income", "operating_cf", "total_assets", "prev_total_assets",
+    "long_term_debt", "prev_long_term_debt", "current_assets", "current_liabilities",
+    "prev_current_assets", "prev_current_liabilities", "revenue", "cogs", "prev_revenue", "prev_cogs",
+    "retained_earnings", "ebit", "total_liabilities", "interest_expense", "market_cap",
+)
+FUNDAMENTAL_METRICS = ("z_score", "current_ratio", "debt_to_equity", "interest_coverage", "roa", "gross_margin")
+
+
+@njit(cache=True, nogil=True, error_model="numpy")
+def _ratio(num: float, den: float, fill: float) -> float:
+    return num / den if den != 0 else fill
+
+
+@njit(cache=True, nogil=True, error_model="numpy")
+def fundamental_scores_kernel(data: np.ndarray):
+    """
+    Piotroski checks and Altman Z-Score for one FUNDAMENTAL_COLUMNS row per ticker, in one pass.
+
+    Returns (f_bits, metrics): the nine Piotroski checks as a bitmask (bit k set when check k
+    passed; the F-Score is its popcount) and an (N, 6) array of FUNDAMENTAL_METRICS. A ratio with a zero
+    denominator is 0, except interest coverage, which is NaN.
+    """
+    n = data.shape[0]
+    f_bits = np.zeros(n, dtype=np.uint16)
+    metrics = np.empty((n, 6))
+
+    for i in range(n):
+        row = data[i]
+        net_income = row[0]
+        prev_net_income = row[1]
+        operating_cf = row[2]
+        total_assets = row[3]
+        prev_total_assets = row[4]
+        current_assets = row[7]
+        current_liabilities = row[8]
+        revenue = row[11]
+        prev_revenue = row[13]
+        ebit = row[16]
+        total_liabilities = row[17]
+
+        # total_assets is the denominator of six ratios: divide once and multiply
+        roa = asset_turnover = x1 = x2 = x3 = 0.0
+        if total_assets != 0:
+            inv_assets = 1.0 / total_assets
+            roa = net_income * inv_assets
+            asset_turnover = revenue * inv_assets
+            x1 = (current_assets - current_liabilities) * inv_assets
+            x2 = row[15] * inv_assets
+            x3 = ebit * inv_assets
+        prev_roa = prev_asset_turnover = 0.0
+        if prev_total_assets != 0:
+            inv_prev_assets = 1.0 / prev_total_assets
+            prev_roa = prev_net_income * inv_prev_assets
+            prev_asset_turnover = prev_revenue * inv_prev_assets
+        current_ratio = _ratio(current_assets, current_liabilities, 0.0)
+        gross_margin = _ratio(revenue - row[12], revenue, 0.0)
+
+        bits = (
+            (net_income > 0)
+            | (operating_cf > 0) << 1
+            | (roa > prev_roa) << 2
+            | (operating_cf > net_income) << 3
+            | (row[5] < row[6]) << 4
+            | (current_ratio > _ratio(row[9], row[10], 0.0)) << 5
+            # No share count history, so no dilution is assumed
+            | 1 << 6
+            | (gross_margin > _ratio(prev_revenue - row[14], prev_revenue, 0.0)) << 7
+            | (asset_turnover > prev_asset_turnover) << 8
+        )
+        f_bits[i] = bits
+
+        x4 = _ratio(row[19], total_liabilities, 0.0)
+        x5 = asset_turnover
+
+        metrics[i, 0] = 1.2*x1 + 1.4*x2 + 3.3*x3 + 0.6*x4 + 1.0*x5
+        metrics[i, 1] = current_ratio
+        metrics[i, 2] = _ratio(total_liabilities, total_assets - total_liabilities, 0.0)
+        metrics[i, 3] = _ratio(ebit, row[18], np.nan)
+        metrics[i, 4] = roa
+        metrics[i, 5] = gross_margin
+
+    return f_bits, metrics
+
+
+@njit(cache=True, nogil=True, error_model="numpy")
+def bollinger_kernel(data: np.ndarray, period: int, std_dev: float):
+    """Bollinger Bands in one pass: sliding-window Welford mean and sample (ddof=1) variance."""
+    n = len(data)
+    upper = np.full(n, np.nan)
+    middle = np.full(n, np.nan)
+    lower = np.full(n, np.nan)
+
+    mean = 0.0
+    m2 = 0.0
+    nan_count = 0
+    seeded = False
+    for i in range(n):
+        if np.isnan(data[i]):
+            nan_count += 1
+        if i >= period and np.isnan(data[i - period]):
+            nan_count -= 1
+        if i < period - 1:
+            continue
+        if nan_count > 0:
+            # Any NaN in the window yields NaN; re-seed once it has left the window
+            seeded = False
+            continue
+
+        if not seeded:
+            mean = 0.0
+            for j in range(i - period + 1, i + 1):
+                mean += data[j]
+            mean /= period
+            m2 = 0.0
+            for j in range(i - period + 1, i + 1):
+                m2 += (data[j] - mean) ** 2
+            seeded = True
+        else:
+            # Swap the leaving value for the entering one without rescanning the window
+            old = data[i - period]
+            new_mean = mean + (data[i] - old) / period
+            m2 += (data[i] - old) * (data[i] - new_mean + old - mean)
+            mean = new_mean
+
+        std = np.sqrt(max(m2, 0.0) / (period - 1))
+        middle[i] = mean
+        upper[i] = mean + std * std_dev
+        lower[i] = mean - std * std_dev
+
+    return upper, middle, lower
+
+
+@njit(cache=True, nogil=True, error_model="numpy")
+def stochastic_kernel(high: np.ndarray, low: np.ndarray, close: np.ndarray,
+                      period: int, smooth_k: int, smooth_d: int):
+    """
+    Slow stochastic %K/%D in one pass; any NaN inside a window yields NaN, as pandas rolling does.
+
+    The window low/high come from monotonic deques of indices (amortized O(1) per bar),
+    and %K/%D are smoothed as soon as each raw value is available.
+    """
+    n = len(close)
+    raw_k = np.full(n, np.nan)
+    k = np.full(n, np.nan)
+    d = np.full(n, np.nan)
+
+    # Indices of candidate window minima (increasing lows) and maxima (decreasing highs)
+    min_idx = np.empty(n, dtype=np.int64)
+    max_idx = np.empty(n, dtype=np.int64)
+    min_head = min_tail = max_head = max_tail = 0
+    nan_count = 0
+
+    for i in range(n):
+        # NaNs are counted rather than queued; a window holding one yields NaN regardless
+        if np.isnan(low[i]) or np.isnan(high[i]):
+            nan_count += 1
+        if i >= period and (np.isnan(low[i - period]) or np.isnan(high[i - period])):
+            nan_count -= 1
+
+        if not np.isnan(low[i]):
+            while min_tail > min_head and low[min_idx[min_tail - 1]] >= low[i]:
+                min_tail -= 1
+            min_idx[min_tail] = i
+            min_tail += 1
+        if not np.isnan(high[i]):
+            while max_tail > max_head and high[max_idx[max_tail - 1]] <= high[i]:
+                max_tail -= 1
+            max_idx[max_tail] = i
+            max_tail += 1
+        while min_tail > min_head and min_idx[min_head] <= i - period:
+            min_head += 1
+        while max_tail > max_head and max_idx[max_head] <= i - period:
+            max_head += 1
+
+        if i >= period - 1 and nan_count == 0:
+            lowest = low[min_idx[min_head]]
+            highest = high[max_idx[max_head]]
+            raw_k[i] = 100.0 * (close[i] - lowest) / (highest - lowest)
+
+        if i >= smooth_k - 1:
+            total = 0.0
+            for j in range(i - smooth_k + 1, i + 1):
+                total += raw_k[j]
+            k[i] = total / smooth_k
+        if i >= smooth_d - 1:
+            total = 0.0
+            for j in range(i - smooth_d + 1, i + 1):
+                total += k[j]
+            d[i] = total / smooth_d
+
+    return k, d
+
+
+@njit(cache=True, nogil=True, error_model="numpy")
+def pattern_stats_kernel(close: np.ndarray, trend_window: int, range_window: int):
+    """
+    Inputs to detect_patterns' trend and consolidation checks in one call.
+
+    Returns (uptrend, downtrend, recent_var, overall_var): whether each of the last
+    trend_window closes is strictly above / below the one before (False on shorter
+    series), and the population variance of the last range_window closes and of the
+    series. Both variances come from one Welford pass over close.
+    """
+    n = len(close)
+    uptrend = downtrend = n >= trend_window
+    for i in range(n - trend_window + 1, n):
+        if not (uptrend or downtrend):
+            break
+        step = close[i] - close[i - 1]
+        # NaN steps fail both tests, as they do np.diff's min/max
+        if not step > 0:
+            uptrend = False
+        if not step < 0:
+            downtrend = False
+
+    tail_start = max(n - range_window, 0)
+    mean = m2 = tail_mean = tail_m2 = 0.0
+    for i in range(n):
+        x = close[i]
+        delta = x - mean
+        mean += delta / (i + 1)
+        m2 += delta * (x - mean)
+        if i >= tail_start:
+            delta = x - tail_mean
+            tail_mean += delta / (i - tail_start + 1)
+            tail_m2 += delta * (x - tail_mean)
+
+    return uptrend, downtrend, tail_m2 / (n - tail_start), m2 / n
@@ -3,10 +3,77 @@ Technical Analysis Module for Investor Agent
 Pure Python implementations that don't require TA-Lib
 """
 
+import math
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
 import numpy as np
 import pandas as pd
-from scipy.signal import argrelextrema
-from typing import Dict, List, Any, Tuple
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import lfilter
+from typing import Dict, List, Any, Tuple, Union
+
+from .ta_kernels import (
+    _numba_available, atr_kernel, bollinger_kernel, ema_kernel, ema_multi_kernel, pattern_stats_kernel,
+    rsi_kernel, sma_kernel, stochastic_kernel
+)
+
+# Optional C moving-window reductions, used when the numba kernels are unavailable
+try:
+    import bottleneck as bn  # type: ignore
+    _bottleneck_available = True
+except ImportError:
+    _bottleneck_available = False
+
+
+# Screen indicator values per symbol, reused across scan cycles until the screened window changes
+_SCREEN_STATE_MAXSIZE = 1024
+_screen_state: "OrderedDict[str, Tuple[tuple, Dict[str, Any]]]" = OrderedDict()
+_screen_state_lock = threading.Lock()
+
+# detect_patterns' placeholder entry when nothing is found; shared, so treat it as read-only
+_NO_PATTERNS = ({"pattern": "None", "description": "No clear patterns detected", "signal": "Neutral"},)
+
+
+@dataclass(frozen=True)
+class HistoryBundle:
+    """
+    Price history with its OHLCV columns extracted once, shared across indicators.
+    
+    Columns are contiguous float64 arrays, the layout the kernels work in, so callers
+    never need to re-cast them. Float64 frames are not copied.
+    """
+    df: pd.DataFrame
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+    
+    @classmethod
+    def of(cls, data: Union[pd.DataFrame, "HistoryBundle"]) -> "HistoryBundle":
+        """Wrap a DataFrame, passing an existing bundle through unchanged."""
+        if isinstance(data, cls):
+            return data
+        def column(name: str) -> np.ndarray:
+            return np.ascontiguousarray(data[name].to_numpy(dtype=np.float64, copy=False))
+        
+        return cls(
+            df=data,
+            open=column('Open'),
+            high=column('High'),
+            low=column('Low'),
+            close=column('Close'),
+            volume=column('Volume')
+        )
+    
+    def __len__(self) -> int:
+        return len(self.close)
+
+
+PriceData = Union[pd.DataFrame, HistoryBundle]
 
 
 class TechnicalIndicators:
@@ -15,20 +82,44 @@ class TechnicalIndicators:
     @staticmethod
     def calculate_sma(data: np.ndarray, period: int) -> np.ndarray:
         """Simple Moving Average."""
-        return pd.Series(data).rolling(window=period).mean().values
+        if _numba_available:
+            return sma_kernel(np.asarray(data, dtype=np.float64), period)
+        return TechnicalIndicators._rolling(data, period, "mean")
     
     @staticmethod
     def calculate_ema(data: np.ndarray, period: int) -> np.ndarray:
         """Exponential Moving Average."""
+        if _numba_available:
+            return ema_kernel(np.asarray(data, dtype=np.float64), period)
+        
+        data = np.asarray(data, dtype=np.float64)
+        if len(data) and not np.isnan(data).any():
+            # ema[i] = alpha*x[i] + (1-alpha)*ema[i-1] seeded with x[0] is a one-pole IIR filter
+            alpha = 2. / (period + 1.)
+            return lfilter([alpha], [1., alpha - 1.], data, zi=[(1. - alpha) * data[0]])[0]
+        # pandas skips NaN gaps in the recurrence
         return pd.Series(data).ewm(span=period, adjust=False).mean().values
     
+    @staticmethod
+    def calculate_emas(data: np.ndarray, periods: Tuple[int, ...]) -> List[np.ndarray]:
+        """Exponential Moving Averages for several periods, in one pass when numba is available."""
+        if _numba_available:
+            return list(ema_multi_kernel(np.asarray(data, dtype=np.float64), np.array(periods, dtype=np.float64)))
+        return [TechnicalIndicators.calculate_ema(data, period) for period in periods]
+    
     @staticmethod
     def calculate_rsi(data: np.ndarray, period: int = 14) -> np.ndarray:
         """Relative Strength Index."""
+        if _numba_available:
+            return rsi_kernel(np.asarray(data, dtype=np.float64), period)
+        
         deltas = np.diff(data)
-        seed = deltas[:period+1]
-        up = seed[seed >= 0].sum() / period
-        down = -seed[seed < 0].sum() / period
+        # Split moves once for both the seed and the smoothing. A NaN move counts as no gain
+        # and an unknown loss; the warm-up average simply leaves it out
+        gains = np.fmax(deltas, 0.)
+        losses = np.maximum(-deltas, 0.)
+        up = gains[:period+1].sum() / period
+        down = np.nansum(losses[:period+1]) / period
         
         if down == 0:
             return np.full(len(data), 100.0)
@@ -37,20 +128,15 @@ class TechnicalIndicators:
         rsi = np.zeros_like(data)
         rsi[:period] = 100. - 100./(1. + rs)
         
-        for i in range(period, len(data)):
-            delta = deltas[i-1]
-            if delta > 0:
-                upval = delta
-                downval = 0.
-            else:
-                upval = 0.
-                downval = -delta
-            
-            up = (up * (period - 1) + upval) / period
-            down = (down * (period - 1) + downval) / period
+        if len(data) > period:
+            # Wilder smoothing s[i] = s[i-1]*(period-1)/period + x[i]/period is a one-pole
+            # IIR filter, so lfilter runs the whole recurrence in C, seeded with the warm-up value
+            decay = (period - 1) / period
+            up = lfilter([1. / period], [1., -decay], gains[period-1:], zi=[up * decay])[0]
+            down = lfilter([1. / period], [1., -decay], losses[period-1:], zi=[down * decay])[0]
             
-            rs = up / down if down != 0 else 0
-            rsi[i] = 100. - 100./(1. + rs)
+            rs = np.divide(up, down, out=np.zeros_like(up), where=down != 0)
+            rsi[period:] = 100. - 100./(1. + rs)
         
         return rsi
     
@@ -73,8 +159,20 @@ class TechnicalIndicators:
                                   period: int = 20, 
                                   std_dev: int = 2) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
         """Bollinger Bands."""
-        sma = TechnicalIndicators.calculate_sma(data, period)
-        rolling_std = pd.Series(data).rolling(window=period).std().values
+        data = np.asarray(data, dtype=np.float64)
+        if _numba_available:
+            return bollinger_kernel(data, period, float(std_dev))
+        
+        sma = np.full(len(data), np.nan)
+        rolling_std = np.full(len(data), np.nan)
+        if _bottleneck_available and len(data) >= period:
+            sma = bn.move_mean(data, period, min_count=period)
+            rolling_std = bn.move_std(data, period, min_count=period, ddof=1)
+        elif len(data) >= period:
+            # One strided view of the windows serves both the mean and the sample std
+            windows = sliding_window_view(data, period)
+            sma[period - 1:] = windows.mean(axis=1)
+            rolling_std[period - 1:] = windows.std(axis=1, ddof=1)
         
         upper_band = sma + (rolling_std * std_dev)
         lower_band = sma - (rolling_std * std_dev)
@@ -89,53 +187,79 @@ class TechnicalIndicators:
                             smooth_k: int = 3,
                             smooth_d: int = 3) -> Tuple[np.ndarray, np.ndarray]:
         """Stochastic Oscillator."""
-        lowest_low = pd.Series(low).rolling(window=period).min().values
-        highest_high = pd.Series(high).rolling(window=period).max().values
+        if _numba_available:
+            return stochastic_kernel(np.asarray(high, dtype=np.float64), np.asarray(low, dtype=np.float64),
+                                     np.asarray(close, dtype=np.float64), period, smooth_k, smooth_d)
+        
+        lowest_low = TechnicalIndicators._rolling(low, period, "min")
+        highest_high = TechnicalIndicators._rolling(high, period, "max")
         
         k = 100 * (close - lowest_low) / (highest_high - lowest_low)
-        k = pd.Series(k).rolling(window=smooth_k).mean().values
-        d = pd.Series(k).rolling(window=smooth_d).mean().values
+        k = TechnicalIndicators._rolling(k, smooth_k, "mean")
+        d = TechnicalIndicators._rolling(k, smooth_d, "mean")
         
         return k, d
     
+    @staticmethod
+    def _rolling(data: np.ndarray, period: int, reducer: str) -> np.ndarray:
+        """Apply a NumPy reduction over trailing windows, NaN-padded to the input length."""
+        data = np.asarray(data, dtype=np.float64)
+        if _bottleneck_available and len(data) >= period:
+            return getattr(bn, f"move_{reducer}")(data, period, min_count=period)
+        out = np.full(len(data), np.nan)
+        if len(data) >= period:
+            out[period - 1:] = getattr(sliding_window_view(data, period), reducer)(axis=1)
+        return out
+    
     @staticmethod
     def calculate_atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = 14) -> np.ndarray:
-        """Average True Range (ATR) for volatility measurement."""
-        # True Range calculation
-        high_low = high - low
-        high_close = np.abs(high - np.roll(close, 1))
-        low_close = np.abs(low - np.roll(close, 1))
+        """Average True Range (ATR) for volatility measurement, with Wilder's smoothing (alpha = 1/period)."""
+        if _numba_available:
+            return atr_kernel(np.asarray(high, dtype=np.float64), np.asarray(low, dtype=np.float64),
+                              np.asarray(close, dtype=np.float64), period)
+        
+        high = np.asarray(high, dtype=np.float64)
+        low = np.asarray(low, dtype=np.float64)
+        close = np.asarray(close, dtype=np.float64)
         
-        true_range = np.maximum(high_low, np.maximum(high_close, low_close))
-        true_range[0] = high_low[0]  # First value
+        # True Range: fold the three candidates into one buffer in place. The first bar
+        # has no previous close, so it is just high - low
+        true_range = high - low
+        prev_close = close[:-1]
+        tail = true_range[1:]
+        np.maximum(tail, np.abs(high[1:] - prev_close), out=tail)
+        np.maximum(tail, np.abs(low[1:] - prev_close), out=tail)
         
-        # ATR is EMA of True Range
-        atr = pd.Series(true_range).ewm(span=period, adjust=False).mean().values
+        # Wilder's smoothing is the EMA with alpha = 1/period, i.e. span = 2*period - 1
+        atr = TechnicalIndicators.calculate_ema(true_range, 2 * period - 1)
         
         return atr
     
     @staticmethod
-    def calculate_vwap(df: pd.DataFrame) -> float:
+    def calculate_vwap(df: PriceData) -> float:
         """Volume Weighted Average Price."""
-        typical_price = (df['High'] + df['Low'] + df['Close']) / 3
-        vwap = (typical_price * df['Volume']).sum() / df['Volume'].sum()
-        return vwap
+        bundle = HistoryBundle.of(df)
+        typical_price = (bundle.high + bundle.low + bundle.close) / 3
+        volume_price = np.dot(typical_price, bundle.volume)
+        if math.isnan(volume_price):
+            # Missing prices or volumes are skipped, as pandas sums them
+            return float(np.nansum(typical_price * bundle.volume) / np.nansum(bundle.volume))
+        return float(volume_price / bundle.volume.sum())
     
     @staticmethod
     def calculate_obv(close: np.ndarray, volume: np.ndarray) -> np.ndarray:
         """On Balance Volume."""
-        obv = np.zeros(len(close))
-        obv[0] = volume[0]
-        
-        for i in range(1, len(close)):
-            if close[i] > close[i-1]:
-                obv[i] = obv[i-1] + volume[i]
-            elif close[i] < close[i-1]:
-                obv[i] = obv[i-1] - volume[i]
-            else:
-                obv[i] = obv[i-1]
+        close = np.asarray(close, dtype=np.float64)
+        volume = np.asarray(volume, dtype=np.float64)
+        if len(close) == 0:
+            return np.zeros(0)
         
-        return obv
+        # Signed volume per bar (up: +, down: -, flat or undefined: 0), accumulated in bar order
+        change = np.diff(close)
+        flow = np.empty(len(close))
+        flow[0] = volume[0]
+        flow[1:] = np.where(change > 0, volume[1:], np.where(change < 0, -volume[1:], 0.))
+        return np.cumsum(flow)
     
     @staticmethod
     def calculate_mfi(high: np.ndarray, low: np.ndarray, close: np.ndarray, 
@@ -145,22 +269,19 @@ class TechnicalIndicators:
         money_flow = typical_price * volume
         
         mfi = np.zeros(len(close))
+        if len(close) <= period:
+            return mfi
         
-        for i in range(period, len(close)):
-            positive_flow = 0
-            negative_flow = 0
-            
-            for j in range(i - period + 1, i + 1):
-                if typical_price[j] > typical_price[j-1]:
-                    positive_flow += money_flow[j]
-                elif typical_price[j] < typical_price[j-1]:
-                    negative_flow += money_flow[j]
-            
-            if negative_flow == 0:
-                mfi[i] = 100
-            else:
-                money_ratio = positive_flow / negative_flow
-                mfi[i] = 100 - (100 / (1 + money_ratio))
+        # Money flow of bars whose typical price rose / fell, summed over each period-bar window
+        change = np.diff(typical_price)
+        positive_flow = np.where(change > 0, money_flow[1:], 0.)
+        negative_flow = np.where(change < 0, money_flow[1:], 0.)
+        positive_flow = sliding_window_view(positive_flow, period).sum(axis=1)
+        negative_flow = sliding_window_view(negative_flow, period).sum(axis=1)
+        
+        money_ratio = np.divide(positive_flow, negative_flow,
+                                out=np.zeros_like(positive_flow), where=negative_flow != 0)
+        mfi[period:] = np.where(negative_flow == 0, 100., 100 - (100 / (1 + money_ratio)))
         
         return mfi
 
@@ -169,73 +290,69 @@ class VolumeAnalysis:
     """Volume-specific analysis tools."""
     
     @staticmethod
-    def calculate_volume_profile(df: pd.DataFrame, num_bins: int = 20) -> Dict[str, Any]:
+    def calculate_volume_profile(df: PriceData, num_bins: int = 20) -> Dict[str, Any]:
         """Calculate volume profile (volume by price level)."""
+        bundle = HistoryBundle.of(df)
+        
         # Create price bins
-        price_range = df['High'].max() - df['Low'].min()
+        low_min = np.nanmin(bundle.low)
+        price_range = np.nanmax(bundle.high) - low_min
         bin_size = price_range / num_bins
         
-        # Initialize bins
-        volume_by_price = {}
+        # Approximate which price bin each bar contributed to, capped at the max bin
+        avg_price = (bundle.high + bundle.low + bundle.close) / 3
+        bin_indices = np.minimum(((avg_price - low_min) / bin_size).astype(np.int64), num_bins - 1)
+        bin_volumes = np.bincount(bin_indices, weights=bundle.volume)
         
-        for _, row in df.iterrows():
-            # Approximate which price bin this bar contributed to
-            avg_price = (row['High'] + row['Low'] + row['Close']) / 3
-            bin_index = int((avg_price - df['Low'].min()) / bin_size)
-            bin_index = min(bin_index, num_bins - 1)  # Cap at max bin
-            
-            bin_price = df['Low'].min() + (bin_index * bin_size) + (bin_size / 2)
-            
-            if bin_price not in volume_by_price:
-                volume_by_price[bin_price] = 0
-            volume_by_price[bin_price] += row['Volume']
+        # Occupied bins as parallel price/volume arrays, in order of first appearance
+        _, first_seen = np.unique(bin_indices, return_index=True)
+        occupied = bin_indices[np.sort(first_seen)]
+        prices = low_min + (occupied * bin_size) + (bin_size / 2)
+        volumes = bin_volumes[occupied]
         
         # Find POC (Point of Control) - price with most volume
-        poc_price = max(volume_by_price, key=volume_by_price.get)
-        max_volume = volume_by_price[poc_price]
-        
-        # Calculate Value Area (70% of volume)
-        sorted_prices = sorted(volume_by_price.items(), key=lambda x: x[1], reverse=True)
-        total_volume = sum(volume_by_price.values())
-        value_area_volume = total_volume * 0.70
-        
-        cumulative_volume = 0
-        value_area_prices = []
+        poc_price = prices[np.argmax(volumes)]
         
-        for price, vol in sorted_prices:
-            cumulative_volume += vol
-            value_area_prices.append(price)
-            if cumulative_volume >= value_area_volume:
-                break
-        
-        value_area_high = max(value_area_prices)
-        value_area_low = min(value_area_prices)
+        # Calculate Value Area (70% of volume): take bins by descending volume (ties in
+        # appearance order) until they cover it
+        by_volume = np.argsort(-volumes, kind='stable')
+        cumulative_volume = np.cumsum(volumes[by_volume])
+        value_area_volume = volumes.sum() * 0.70
+        covered = min(int(np.searchsorted(cumulative_volume, value_area_volume)), len(by_volume) - 1)
+        value_area_prices = prices[by_volume[:covered + 1]]
         
         return {
             "poc": poc_price,
-            "value_area_high": value_area_high,
-            "value_area_low": value_area_low,
-            "volume_by_price": volume_by_price
+            "value_area_high": value_area_prices.max(),
+            "value_area_low": value_area_prices.min(),
+            "volume_by_price": dict(zip(prices.tolist(), volumes.tolist())),
+            "volume_by_price_array": {"price": prices, "volume": volumes}
         }
     
     @staticmethod
-    def detect_volume_surges(df: pd.DataFrame, threshold: float = 2.0) -> List[Dict[str, Any]]:
+    def detect_volume_surges(df: PriceData, threshold: float = 2.0) -> List[Dict[str, Any]]:
         """Detect volume surges above average."""
-        avg_volume = df['Volume'].rolling(window=20).mean()
+        bundle = HistoryBundle.of(df)
+        volume = bundle.volume
+        close = bundle.close
+        avg_volume = pd.Series(volume).rolling(window=20).mean().to_numpy()
+        
+        # Flag every surge at once; only the last 5 are reported, so only those become dicts
+        is_surge = volume > avg_volume * threshold
+        is_surge[:20] = False
         surges = []
         
-        for i in range(20, len(df)):
-            if df['Volume'].iloc[i] > avg_volume.iloc[i] * threshold:
-                price_change = (df['Close'].iloc[i] - df['Close'].iloc[i-1]) / df['Close'].iloc[i-1] * 100
-                
-                surges.append({
-                    "date": df.index[i].strftime('%Y-%m-%d'),
-                    "volume": int(df['Volume'].iloc[i]),
-                    "vs_average": df['Volume'].iloc[i] / avg_volume.iloc[i],
-                    "price_change": price_change
-                })
+        for i in np.flatnonzero(is_surge)[-5:]:
+            price_change = (close[i] - close[i-1]) / close[i-1] * 100
+            
+            surges.append({
+                "date": bundle.df.index[i].strftime('%Y-%m-%d'),
+                "volume": int(volume[i]),
+                "vs_average": volume[i] / avg_volume[i],
+                "price_change": price_change
+            })
         
-        return surges[-5:]  # Return last 5 surges
+        return surges
 
 
 class VolatilityAnalysis:
@@ -308,136 +425,71 @@ class FundamentalScoring:
     @staticmethod
     def calculate_piotroski_f_score(financials: Dict[str, pd.DataFrame]) -> Dict[str, Any]:
         """Calculate Piotroski F-Score (0-9)."""
-        score = 0
         details = {}
         
         try:
-            # Get income statement and balance sheet
-            income = financials.get('income')
-            balance = financials.get('balance')
-            cash_flow = financials.get('cash')
+            # Pull each statement's two latest periods (columns, newest first) out once;
+            # every test below is then a dict lookup and a comparison
+            period = FundamentalScoring._period_items
+            income_now, income_prev = period(financials.get('income'), 0), period(financials.get('income'), 1)
+            balance_now, balance_prev = period(financials.get('balance'), 0), period(financials.get('balance'), 1)
+            has_cash_flow = financials.get('cash') is not None
+            cash_now = period(financials.get('cash'), 0)
+            ratio = FundamentalScoring._ratio
             
-            if income is None or balance is None:
+            if income_now is None or balance_now is None:
                 return {"score": 0, "error": "Insufficient financial data"}
             
             # PROFITABILITY (4 points)
             # 1. Positive ROA
-            try:
-                net_income = income.iloc[:, 0].get('Net Income', 0)
-                total_assets = balance.iloc[:, 0].get('Total Assets', 1)
-                roa = net_income / total_assets if total_assets != 0 else 0
-                
-                if roa > 0:
-                    score += 1
-                    details['positive_roe'] = True
-                else:
-                    details['positive_roe'] = False
-            except:
-                details['positive_roe'] = False
+            roa = ratio(income_now.get('Net Income', 0), balance_now.get('Total Assets', 1))
+            details['positive_roe'] = bool(roa > 0)
             
             # 2. Positive Operating Cash Flow
-            if cash_flow is not None:
-                try:
-                    operating_cf = cash_flow.iloc[:, 0].get('Operating Cash Flow', 0)
-                    if operating_cf > 0:
-                        score += 1
-                        details['positive_operating_cf'] = True
-                    else:
-                        details['positive_operating_cf'] = False
-                except:
-                    details['positive_operating_cf'] = False
+            if has_cash_flow:
+                details['positive_operating_cf'] = (
+                    cash_now is not None and bool(cash_now.get('Operating Cash Flow', 0) > 0)
+                )
             
             # 3. ROA increase (compare to previous period)
-            if len(income.columns) >= 2 and len(balance.columns) >= 2:
-                try:
-                    net_income_prev = income.iloc[:, 1].get('Net Income', 0)
-                    total_assets_prev = balance.iloc[:, 1].get('Total Assets', 1)
-                    roa_prev = net_income_prev / total_assets_prev if total_assets_prev != 0 else 0
-                    
-                    if roa > roa_prev:
-                        score += 1
-                        details['roa_increase'] = True
-                    else:
-                        details['roa_increase'] = False
-                except:
-                    details['roa_increase'] = False
+            if income_prev is not None and balance_prev is not None:
+                roa_prev = ratio(income_prev.get('Net Income', 0), balance_prev.get('Total Assets', 1))
+                details['roa_increase'] = bool(roa > roa_prev)
             
             # 4. CF > NI (quality of earnings)
-            if cash_flow is not None:
-                try:
-                    operating_cf = cash_flow.iloc[:, 0].get('Operating Cash Flow', 0)
-                    net_income = income.iloc[:, 0].get('Net Income', 0)
-                    
-                    if operating_cf > net_income:
-                        score += 1
-                        details['cf_vs_ni'] = True
-                    else:
-                        details['cf_vs_ni'] = False
-                except:
-                    details['cf_vs_ni'] = False
+            if has_cash_flow:
+                details['cf_vs_ni'] = (
+                    cash_now is not None
+                    and bool(cash_now.get('Operating Cash Flow', 0) > income_now.get('Net Income', 0))
+                )
             
             # LEVERAGE/LIQUIDITY (3 points)
-            # 5. Decrease in long-term debt
-            if len(balance.columns) >= 2:
-                try:
-                    lt_debt = balance.iloc[:, 0].get('Long Term Debt', 0)
-                    lt_debt_prev = balance.iloc[:, 1].get('Long Term Debt', 0)
-                    
-                    if lt_debt < lt_debt_prev:
-                        score += 1
-                        details['debt_decrease'] = True
-                    else:
-                        details['debt_decrease'] = False
-                except:
-                    details['debt_decrease'] = False
-            
-            # 6. Increase in current ratio
-            if len(balance.columns) >= 2:
-                try:
-                    current_assets = balance.iloc[:, 0].get('Current Assets', 0)
-                    current_liab = balance.iloc[:, 0].get('Current Liabilities', 1)
-                    current_ratio = current_assets / current_liab if current_liab != 0 else 0
-                    
-                    current_assets_prev = balance.iloc[:, 1].get('Current Assets', 0)
-                    current_liab_prev = balance.iloc[:, 1].get('Current Liabilities', 1)
-                    current_ratio_prev = current_assets_prev / current_liab_prev if current_liab_prev != 0 else 0
-                    
-                    if current_ratio > current_ratio_prev:
-                        score += 1
-                        details['current_ratio_increase'] = True
-                    else:
-                        details['current_ratio_increase'] = False
-                except:
-                    details['current_ratio_increase'] = False
+            if balance_prev is not None:
+                # 5. Decrease in long-term debt
+                details['debt_decrease'] = bool(
+                    balance_now.get('Long Term Debt', 0) < balance_prev.get('Long Term Debt', 0)
+                )
+                
+                # 6. Increase in current ratio
+                current_ratio = ratio(balance_now.get('Current Assets', 0), balance_now.get('Current Liabilities', 1))
+                current_ratio_prev = ratio(balance_prev.get('Current Assets', 0), balance_prev.get('Current Liabilities', 1))
+                details['current_ratio_increase'] = bool(current_ratio > current_ratio_prev)
             
             # 7. No new shares issued (simplified - check if shares outstanding decreased)
             details['shares_decrease'] = False  # Placeholder
             
             # OPERATING EFFICIENCY (2 points)
             # 8. Increase in gross margin
-            if len(income.columns) >= 2:
-                try:
-                    revenue = income.iloc[:, 0].get('Total Revenue', 1)
-                    gross_profit = income.iloc[:, 0].get('Gross Profit', 0)
-                    margin = gross_profit / revenue if revenue != 0 else 0
-                    
-                    revenue_prev = income.iloc[:, 1].get('Total Revenue', 1)
-                    gross_profit_prev = income.iloc[:, 1].get('Gross Profit', 0)
-                    margin_prev = gross_profit_prev / revenue_prev if revenue_prev != 0 else 0
-                    
-                    if margin > margin_prev:
-                        score += 1
-                        details['margin_increase'] = True
-                    else:
-                        details['margin_increase'] = False
-                except:
-                    details['margin_increase'] = False
+            if income_prev is not None:
+                margin = ratio(income_now.get('Gross Profit', 0), income_now.get('Total Revenue', 1))
+                margin_prev = ratio(income_prev.get('Gross Profit', 0), income_prev.get('Total Revenue', 1))
+                details['margin_increase'] = bool(margin > margin_prev)
             
             # 9. Increase in asset turnover
             details['turnover_increase'] = False  # Placeholder
             
             return {
-                "score": score,
+                "score": sum(details.values()),
                 "max_score": 9,
                 "details": details
             }
@@ -448,6 +500,18 @@ class FundamentalScoring:
                 "error": f"Error calculating F-Score: {str(e)}"
             }
     
+    @staticmethod
+    def _period_items(statement: pd.DataFrame | None, column: int) -> Dict[str, Any] | None:
+        """Line items of one reporting period (a statement column) as a dict, or None if absent."""
+        if statement is None or len(statement.columns) <= column:
+            return None
+        return statement.iloc[:, column].to_dict()
+    
+    @staticmethod
+    def _ratio(numerator: float, denominator: float) -> float:
+        """numerator / denominator, or 0 when the denominator is 0."""
+        return numerator / denominator if denominator != 0 else 0
+    
     @staticmethod
     def calculate_altman_z_score(balance: pd.DataFrame, income: pd.DataFrame) -> Dict[str, Any]:
         """Calculate Altman Z-Score for bankruptcy prediction."""
@@ -508,63 +572,113 @@ class TechnicalAnalysis:
     """Advanced technical analysis functions."""
     
     @staticmethod
-    def calculate_comprehensive_indicators(df: pd.DataFrame) -> Dict[str, Any]:
-        """Calculate all technical indicators at once."""
-        closes = df['Close'].values
-        highs = df['High'].values
-        lows = df['Low'].values
+    def calculate_comprehensive_indicators(df: PriceData, summary_only: bool = False) -> Dict[str, Any]:
+        """Calculate all technical indicators at once, or just the headline signals if summary_only."""
+        bundle = HistoryBundle.of(df)
+        closes, highs, lows = bundle.close, bundle.high, bundle.low
+        
+        if summary_only:
+            return TechnicalAnalysis._summary_indicators(closes)
         
         # Calculate indicators
         rsi = TechnicalIndicators.calculate_rsi(closes)
-        macd, signal, histogram = TechnicalIndicators.calculate_macd(closes)
-        upper_bb, middle_bb, lower_bb = TechnicalIndicators.calculate_bollinger_bands(closes)
-        sma_20 = TechnicalIndicators.calculate_sma(closes, 20)
-        sma_50 = TechnicalIndicators.calculate_sma(closes, 50)
-        sma_200 = TechnicalIndicators.calculate_sma(closes, 200)
-        ema_20 = TechnicalIndicators.calculate_ema(closes, 20)
-        stoch_k, stoch_d = TechnicalIndicators.calculate_stochastic(highs, lows, closes)
+        # Only the latest values are reported. Bollinger and the stochastic look back a fixed
+        # window (20 bars; 14 + 2 + 2 for %K over 14 smoothed twice by 3), so their last
+        # values need only that tail. RSI and the EMAs below recurse from the first bar
+        upper_bb, middle_bb, lower_bb = TechnicalIndicators.calculate_bollinger_bands(closes[-20:])
+        stoch_k, stoch_d = TechnicalIndicators.calculate_stochastic(highs[-18:], lows[-18:], closes[-18:])
         
-        current_price = closes[-1]
-        current_rsi = rsi[-1] if not np.isnan(rsi[-1]) else 50
-        current_macd = macd[-1] if not np.isnan(macd[-1]) else 0
-        current_signal = signal[-1] if not np.isnan(signal[-1]) else 0
+        # The MACD EMAs and EMA20 share one sweep over closes
+        ema_12, ema_20, ema_26 = TechnicalIndicators.calculate_emas(closes, (12, 20, 26))
+        macd = ema_12 - ema_26
+        signal = TechnicalIndicators.calculate_ema(macd, 9)
+        histogram = macd - signal
+        # The Bollinger middle band is the 20-bar SMA
+        sma_20 = middle_bb
+        
+        # Only the latest bar is reported: pull each value out once as a Python float
+        current_price = float(closes[-1])
+        rsi_last, macd_last, signal_last, hist_last = float(rsi[-1]), float(macd[-1]), float(signal[-1]), float(histogram[-1])
+        upper_last, middle_last, lower_last = float(upper_bb[-1]), float(middle_bb[-1]), float(lower_bb[-1])
+        # Only the latest 50/200-bar averages are reported, so take the two window means
+        # instead of full SMA arrays; they are undefined (N/A) on shorter histories
+        sma50_last = float(closes[-50:].mean()) if len(closes) >= 50 else math.nan
+        sma200_last = float(closes[-200:].mean()) if len(closes) >= 200 else math.nan
+        sma20_last = float(sma_20[-1])
+        ema20_last, k_last, d_last = float(ema_20[-1]), float(stoch_k[-1]), float(stoch_d[-1])
+        
+        current_rsi = rsi_last if not math.isnan(rsi_last) else 50
+        current_macd = macd_last if not math.isnan(macd_last) else 0
+        current_signal = signal_last if not math.isnan(signal_last) else 0
         
         return {
             "current_price": f"${current_price:.2f}",
             "rsi": {
                 "value": f"{current_rsi:.2f}",
-                "signal": "Overbought" if current_rsi > 70 else "Oversold" if current_rsi < 30 else "Neutral"
+                "raw": float(current_rsi),
+                "signal": TechnicalAnalysis._rsi_signal(current_rsi)
             },
             "macd": {
                 "macd": f"{current_macd:.4f}",
                 "signal": f"{current_signal:.4f}",
-                "histogram": f"{histogram[-1]:.4f}" if not np.isnan(histogram[-1]) else "N/A",
+                "histogram": f"{hist_last:.4f}" if not math.isnan(hist_last) else "N/A",
                 "trend": "Bullish" if current_macd > current_signal else "Bearish"
             },
             "bollinger_bands": {
-                "upper": f"${upper_bb[-1]:.2f}" if not np.isnan(upper_bb[-1]) else "N/A",
-                "middle": f"${middle_bb[-1]:.2f}" if not np.isnan(middle_bb[-1]) else "N/A",
-                "lower": f"${lower_bb[-1]:.2f}" if not np.isnan(lower_bb[-1]) else "N/A",
-                "position": TechnicalAnalysis._bb_position(current_price, upper_bb[-1], lower_bb[-1])
+                "upper": f"${upper_last:.2f}" if not math.isnan(upper_last) else "N/A",
+                "middle": f"${middle_last:.2f}" if not math.isnan(middle_last) else "N/A",
+                "lower": f"${lower_last:.2f}" if not math.isnan(lower_last) else "N/A",
+                "position": TechnicalAnalysis._bb_position(current_price, upper_last, lower_last)
             },
             "moving_averages": {
-                "sma_20": f"${sma_20[-1]:.2f}" if not np.isnan(sma_20[-1]) else "N/A",
-                "sma_50": f"${sma_50[-1]:.2f}" if not np.isnan(sma_50[-1]) else "N/A",
-                "sma_200": f"${sma_200[-1]:.2f}" if not np.isnan(sma_200[-1]) else "N/A",
-                "ema_20": f"${ema_20[-1]:.2f}" if not np.isnan(ema_20[-1]) else "N/A",
-                "trend": TechnicalAnalysis._determine_trend(current_price, sma_50[-1], sma_200[-1])
+                "sma_20": f"${sma20_last:.2f}" if not math.isnan(sma20_last) else "N/A",
+                "sma_50": f"${sma50_last:.2f}" if not math.isnan(sma50_last) else "N/A",
+                "sma_200": f"${sma200_last:.2f}" if not math.isnan(sma200_last) else "N/A",
+                "ema_20": f"${ema20_last:.2f}" if not math.isnan(ema20_last) else "N/A",
+                "trend": TechnicalAnalysis._determine_trend(current_price, sma50_last, sma200_last)
             },
             "stochastic": {
-                "k": f"{stoch_k[-1]:.2f}" if not np.isnan(stoch_k[-1]) else "N/A",
-                "d": f"{stoch_d[-1]:.2f}" if not np.isnan(stoch_d[-1]) else "N/A",
-                "signal": TechnicalAnalysis._stoch_signal(stoch_k[-1])
+                "k": f"{k_last:.2f}" if not math.isnan(k_last) else "N/A",
+                "d": f"{d_last:.2f}" if not math.isnan(d_last) else "N/A",
+                "signal": TechnicalAnalysis._stoch_signal(k_last)
             }
         }
     
+    @staticmethod
+    def _summary_indicators(closes: np.ndarray) -> Dict[str, Any]:
+        """Headline signals only: latest price, RSI, MACD trend, BB position and MA trend."""
+        current_price = closes[-1]
+        current_rsi = TechnicalAnalysis._latest_rsi(closes)
+        # The band position only needs the last 20-bar window
+        upper_bb, _, lower_bb = TechnicalIndicators.calculate_bollinger_bands(closes[-20:])
+        
+        return {
+            "current_price": f"${current_price:.2f}",
+            "rsi": {
+                "value": f"{current_rsi:.2f}",
+                "raw": float(current_rsi),
+                "signal": TechnicalAnalysis._rsi_signal(current_rsi)
+            },
+            "macd": {
+                "trend": TechnicalAnalysis._latest_macd_trend(closes)
+            },
+            "bollinger_bands": {
+                "position": TechnicalAnalysis._bb_position(current_price, upper_bb[-1], lower_bb[-1])
+            },
+            "moving_averages": {
+                "trend": TechnicalAnalysis._latest_ma_trend(closes)
+            }
+        }
+    
+    @staticmethod
+    def _rsi_signal(rsi_value: float) -> str:
+        """Classify an RSI reading."""
+        return "Overbought" if rsi_value > 70 else "Oversold" if rsi_value < 30 else "Neutral"
+    
     @staticmethod
     def _bb_position(price: float, upper: float, lower: float) -> str:
         """Determine price position relative to Bollinger Bands."""
-        if np.isnan(upper) or np.isnan(lower):
+        if math.isnan(upper) or math.isnan(lower):
             return "N/A"
         if price > upper:
             return "Above Upper Band"
@@ -576,7 +690,7 @@ class TechnicalAnalysis:
     @staticmethod
     def _determine_trend(price: float, sma50: float, sma200: float) -> str:
         """Determine overall trend."""
-        if np.isnan(sma50) or np.isnan(sma200):
+        if math.isnan(sma50) or math.isnan(sma200):
             return "Insufficient Data"
         if price > sma50 and price > sma200:
             return "Bullish"
@@ -588,7 +702,7 @@ class TechnicalAnalysis:
     @staticmethod
     def _stoch_signal(k_value: float) -> str:
         """Determine stochastic signal."""
-        if np.isnan(k_value):
+        if math.isnan(k_value):
             return "N/A"
         if k_value > 80:
             return "Overbought"
@@ -598,19 +712,27 @@ class TechnicalAnalysis:
             return "Neutral"
     
     @staticmethod
-    def find_support_resistance(df: pd.DataFrame, order: int = 5) -> Dict[str, Any]:
+    def find_support_resistance(df: PriceData, order: int = 5) -> Dict[str, Any]:
         """Find support and resistance levels using local extrema."""
-        highs = df['High'].values
-        lows = df['Low'].values
-        closes = df['Close'].values
+        bundle = HistoryBundle.of(df)
+        highs = bundle.high
+        lows = bundle.low
+        closes = bundle.close
         
         # Find local maxima (resistance) and minima (support)
-        resistance_indices = argrelextrema(highs, np.greater, order=order)[0]
-        support_indices = argrelextrema(lows, np.less, order=order)[0]
+        resistance_indices = TechnicalAnalysis._local_extrema(highs, np.greater, order)
+        support_indices = TechnicalAnalysis._local_extrema(lows, np.less, order)
         
-        # Get the levels
-        resistance_levels = sorted(highs[resistance_indices], reverse=True)[:3]
-        support_levels = sorted(lows[support_indices])[:3]
+        # Get the levels: only the three highest resistances and three lowest supports are
+        # kept, so partition those out before sorting
+        resistance = highs[resistance_indices]
+        support = lows[support_indices]
+        if len(resistance) > 3:
+            resistance = np.partition(resistance, -3)[-3:]
+        if len(support) > 3:
+            support = np.partition(support, 3)[:3]
+        resistance_levels = list(np.sort(resistance)[::-1])
+        support_levels = list(np.sort(support))
         
         return {
             "current_price": f"${closes[-1]:.2f}",
@@ -621,18 +743,33 @@ class TechnicalAnalysis:
         }
     
     @staticmethod
-    def calculate_trend_strength(df: pd.DataFrame) -> Dict[str, Any]:
-        """Calculate trend strength score."""
-        closes = df['Close'].values
+    def _local_extrema(data: np.ndarray, comparator: np.ufunc, order: int) -> np.ndarray:
+        """
+        Indices where comparator(data[i], data[j]) holds for every j within order bars.
         
-        indicators = TechnicalAnalysis.calculate_comprehensive_indicators(df)
+        Same result as scipy.signal.argrelextrema (clip mode), built from 2*order
+        in-place mask updates instead of its per-shift temporaries.
+        """
+        extrema = np.ones(len(data), dtype=bool)
+        for shift in range(1, order + 1):
+            extrema[shift:] &= comparator(data[shift:], data[:-shift])
+            extrema[:-shift] &= comparator(data[:-shift], data[shift:])
+        # Clip mode compares the end points with themselves, which never holds strictly
+        extrema[[0, -1]] = False
+        return np.flatnonzero(extrema)
+    
+    @staticmethod
+    def calculate_trend_strength(df: PriceData, indicators: Dict[str, Any] | None = None) -> Dict[str, Any]:
+        """Calculate trend strength score, reusing precomputed comprehensive indicators if given."""
+        if indicators is None:
+            indicators = TechnicalAnalysis.calculate_comprehensive_indicators(HistoryBundle.of(df))
         
         # Calculate strength score (0-100)
         score = 0
         analysis = []
         
-        # RSI contribution (25 points)
-        rsi_val = float(indicators['rsi']['value'])
+        # RSI contribution (25 points), scored at display precision
+        rsi_val = round(indicators['rsi']['raw'], 2)
         if 40 < rsi_val < 70:
             score += 25
             analysis.append("RSI in healthy range")
@@ -685,81 +822,234 @@ class TechnicalAnalysis:
         }
     
     @staticmethod
-    def screen_stocks(stock_data: Dict[str, pd.DataFrame], 
+    def screen_stocks(stock_data: Dict[str, PriceData], 
                      criteria: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Screen stocks based on technical criteria."""
-        results = []
-        
+        """Screen stocks based on technical criteria, cheapest check first across all symbols."""
+        candidates = []
         for symbol, df in stock_data.items():
+            # Empty histories (delisted or unknown symbols) are skipped with a length check
+            # rather than by failing further down
+            if len(df) == 0:
+                continue
             try:
-                indicators = TechnicalAnalysis.calculate_comprehensive_indicators(df)
-                
-                matches = True
-                matched_criteria = []
-                
-                # Check RSI criteria
-                if 'rsi_below' in criteria:
-                    rsi_val = float(indicators['rsi']['value'])
-                    if rsi_val >= criteria['rsi_below']:
-                        matches = False
-                    else:
-                        matched_criteria.append(f"RSI below {criteria['rsi_below']}")
-                
-                if 'rsi_above' in criteria:
-                    rsi_val = float(indicators['rsi']['value'])
-                    if rsi_val <= criteria['rsi_above']:
-                        matches = False
-                    else:
-                        matched_criteria.append(f"RSI above {criteria['rsi_above']}")
-                
-                # Check moving average criteria
-                if criteria.get('above_sma50'):
-                    if indicators['moving_averages']['trend'] not in ["Bullish", "Mixed"]:
-                        matches = False
-                    else:
-                        matched_criteria.append("Above SMA50")
-                
-                # Check MACD criteria
-                if criteria.get('macd_bullish'):
-                    if indicators['macd']['trend'] != "Bullish":
-                        matches = False
-                    else:
-                        matched_criteria.append("MACD Bullish")
-                
-                if matches:
-                    results.append({
-                        "symbol": symbol,
-                        "current_price": indicators['current_price'],
-                        "rsi": indicators['rsi']['value'],
-                        "rsi_signal": indicators['rsi']['signal'],
-                        "macd_trend": indicators['macd']['trend'],
-                        "ma_trend": indicators['moving_averages']['trend'],
-                        "matched_criteria": matched_criteria
-                    })
-            
-            except Exception as e:
+                bundle = HistoryBundle.of(df)
+                candidates.append((symbol, bundle, TechnicalAnalysis._screen_state(symbol, bundle)))
+            except Exception:
                 # Skip stocks that error
                 continue
         
+        # Each check runs over the symbols that survived the previous one, so equal-length
+        # histories can be evaluated together as rows of one matrix
+        checks = []
+        # Moving average criteria (two window means)
+        if criteria.get('above_sma50'):
+            checks.append(("ma_trend", lambda ma_trend: ma_trend in ["Bullish", "Mixed"]))
+        # RSI criteria (one smoothing pass), compared at display precision
+        if 'rsi_below' in criteria:
+            checks.append(("rsi", lambda rsi: round(rsi, 2) < criteria['rsi_below']))
+        if 'rsi_above' in criteria:
+            checks.append(("rsi", lambda rsi: round(rsi, 2) > criteria['rsi_above']))
+        # MACD criteria (three EMAs)
+        if criteria.get('macd_bullish'):
+            checks.append(("macd_trend", lambda macd_trend: macd_trend == "Bullish"))
+        
+        for name, passes in checks:
+            candidates = [c for c in TechnicalAnalysis._fill_screen_values(candidates, name) if passes(c[2][name])]
+        
+        # Only matches pay for the indicators the checks did not need
+        for name in ("ma_trend", "rsi", "macd_trend"):
+            candidates = TechnicalAnalysis._fill_screen_values(candidates, name)
+        
+        matched_criteria = []
+        if 'rsi_below' in criteria:
+            matched_criteria.append(f"RSI below {criteria['rsi_below']}")
+        if 'rsi_above' in criteria:
+            matched_criteria.append(f"RSI above {criteria['rsi_above']}")
+        if criteria.get('above_sma50'):
+            matched_criteria.append("Above SMA50")
+        if criteria.get('macd_bullish'):
+            matched_criteria.append("MACD Bullish")
+        
+        results = []
+        for symbol, bundle, state in candidates:
+            results.append({
+                "symbol": symbol,
+                "current_price": f"${bundle.close[-1]:.2f}",
+                "rsi": f"{state['rsi']:.2f}",
+                "rsi_signal": TechnicalAnalysis._rsi_signal(state['rsi']),
+                "macd_trend": state['macd_trend'],
+                "ma_trend": state['ma_trend'],
+                "matched_criteria": list(matched_criteria)
+            })
+        
         return results
     
     @staticmethod
-    def detect_patterns(df: pd.DataFrame) -> Dict[str, Any]:
-        """Detect common chart patterns."""
-        closes = df['Close'].values
-        highs = df['High'].values
-        lows = df['Low'].values
+    def _fill_screen_values(candidates: List[Tuple[str, HistoryBundle, Dict[str, Any]]],
+                            name: str) -> List[Tuple[str, HistoryBundle, Dict[str, Any]]]:
+        """
+        Make sure every candidate's state holds the named screen indicator.
         
-        patterns_detected = []
+        The MA trend for every candidate comes from one NaN-padded matrix of 200-bar tails;
+        RSI and MACD for NaN-free histories of equal length are computed together as the
+        rows of one matrix. Everything else goes through _screen_value, across a thread
+        pool when there are several. Candidates whose computation fails are dropped.
+        """
+        if name == "ma_trend":
+            rows = [(state, bundle.close) for _, bundle, state in candidates if name not in state]
+            if len(rows) > 1:
+                values = TechnicalAnalysis._latest_ma_trend_rows([closes for _, closes in rows])
+                for (state, _), value in zip(rows, values):
+                    state[name] = value
         
-        # Simple pattern detection
-        recent_closes = closes[-20:]
+        batch_compute = {
+            "rsi": TechnicalAnalysis._latest_rsi_rows,
+            "macd_trend": TechnicalAnalysis._latest_macd_trend_rows
+        }.get(name)
         
-        # Golden Cross / Death Cross
-        sma_50 = TechnicalIndicators.calculate_sma(closes, 50)
-        sma_200 = TechnicalIndicators.calculate_sma(closes, 200)
+        if batch_compute is not None:
+            groups: Dict[int, List[Tuple[Dict[str, Any], np.ndarray]]] = {}
+            for _, bundle, state in candidates:
+                if name not in state and len(bundle) > 1:
+                    if not np.isnan(bundle.close).any():
+                        groups.setdefault(len(bundle), []).append((state, bundle.close))
+            for rows in groups.values():
+                if len(rows) > 1:
+                    values = batch_compute(np.stack([closes for _, closes in rows]))
+                    for (state, _), value in zip(rows, values):
+                        state[name] = value
+        
+        def fill(candidate: Tuple[str, HistoryBundle, Dict[str, Any]]) -> None:
+            try:
+                TechnicalAnalysis._screen_value(candidate[2], name, candidate[1].close)
+            except Exception:
+                pass
         
-        if len(sma_50) > 1 and len(sma_200) > 1:
+        # What the batches left over is independent per symbol and spends its time in
+        # NumPy/numba code that releases the GIL, so spread it over threads. The MA trend
+        # is just two window means, cheaper than handing it to a pool
+        pending = [candidate for candidate in candidates if name not in candidate[2]]
+        if len(pending) > 1 and name != "ma_trend":
+            with ThreadPoolExecutor() as executor:
+                list(executor.map(fill, pending))
+        else:
+            for candidate in pending:
+                fill(candidate)
+        return [candidate for candidate in candidates if name in candidate[2]]
+    
+    @staticmethod
+    def _screen_state(symbol: str, bundle: HistoryBundle) -> Dict[str, Any]:
+        """Values already computed for this symbol's window; starts empty on a new or updated bar."""
+        window_key = (len(bundle), bundle.df.index[0], bundle.df.index[-1], float(bundle.close[-1]))
+        with _screen_state_lock:
+            entry = _screen_state.get(symbol)
+            if entry is None or entry[0] != window_key:
+                entry = (window_key, {})
+                _screen_state[symbol] = entry
+            _screen_state.move_to_end(symbol)
+            while len(_screen_state) > _SCREEN_STATE_MAXSIZE:
+                _screen_state.popitem(last=False)
+            return entry[1]
+    
+    @staticmethod
+    def _screen_value(state: Dict[str, Any], name: str, closes: np.ndarray) -> Any:
+        """Look up a screen indicator in the symbol's state, computing it on first use."""
+        if name not in state:
+            compute = {
+                "ma_trend": TechnicalAnalysis._latest_ma_trend,
+                "rsi": TechnicalAnalysis._latest_rsi,
+                "macd_trend": TechnicalAnalysis._latest_macd_trend
+            }[name]
+            state[name] = compute(closes)
+        return state[name]
+    
+    @staticmethod
+    def _latest_rsi(closes: np.ndarray) -> float:
+        """Latest RSI value, defaulting to 50 when undefined."""
+        rsi = TechnicalIndicators.calculate_rsi(closes)
+        return rsi[-1] if not math.isnan(rsi[-1]) else 50
+    
+    @staticmethod
+    def _latest_rsi_rows(closes: np.ndarray, period: int = 14) -> List[float]:
+        """_latest_rsi for each row of a NaN-free (symbols x bars) matrix, smoothed along axis 1."""
+        deltas = np.diff(closes, axis=1)
+        gains = np.maximum(deltas, 0.)
+        losses = np.maximum(-deltas, 0.)
+        up = gains[:, :period+1].sum(axis=1) / period
+        seed_down = down = losses[:, :period+1].sum(axis=1) / period
+        
+        if closes.shape[1] > period:
+            decay = (period - 1) / period
+            up = lfilter([1. / period], [1., -decay], gains[:, period-1:], axis=1,
+                         zi=(up * decay)[:, None])[0][:, -1]
+            down = lfilter([1. / period], [1., -decay], losses[:, period-1:], axis=1,
+                           zi=(down * decay)[:, None])[0][:, -1]
+        
+        # A zero warm-up loss pins the whole series at 100; a zero later loss gives RS 0
+        rs = np.divide(up, down, out=np.zeros_like(up), where=down != 0)
+        rsi = np.where(seed_down == 0, 100., 100. - 100. / (1. + rs))
+        return [value if not math.isnan(value) else 50 for value in rsi]
+    
+    @staticmethod
+    def _ema_rows(data: np.ndarray, period: int) -> np.ndarray:
+        """EMA (span=period, adjust=False) along axis 1 of a NaN-free matrix."""
+        alpha = 2. / (period + 1.)
+        return lfilter([alpha], [1., alpha - 1.], data, axis=1, zi=((1. - alpha) * data[:, :1]))[0]
+    
+    @staticmethod
+    def _latest_macd_trend_rows(closes: np.ndarray) -> List[str]:
+        """_latest_macd_trend for each row of a NaN-free (symbols x bars) matrix."""
+        macd = TechnicalAnalysis._ema_rows(closes, 12) - TechnicalAnalysis._ema_rows(closes, 26)
+        signal = TechnicalAnalysis._ema_rows(macd, 9)
+        return ["Bullish" if bullish else "Bearish" for bullish in macd[:, -1] > signal[:, -1]]
+    
+    @staticmethod
+    def _latest_macd_trend(closes: np.ndarray) -> str:
+        """Latest MACD trend (MACD line vs signal line)."""
+        macd, signal, _ = TechnicalIndicators.calculate_macd(closes)
+        current_macd = macd[-1] if not math.isnan(macd[-1]) else 0
+        current_signal = signal[-1] if not math.isnan(signal[-1]) else 0
+        return "Bullish" if current_macd > current_signal else "Bearish"
+    
+    @staticmethod
+    def _latest_ma_trend(closes: np.ndarray) -> str:
+        """Latest moving average trend from the last 50/200-bar means only."""
+        sma_50 = closes[-50:].mean() if len(closes) >= 50 else np.nan
+        sma_200 = closes[-200:].mean() if len(closes) >= 200 else np.nan
+        return TechnicalAnalysis._determine_trend(closes[-1], sma_50, sma_200)
+    
+    @staticmethod
+    def _latest_ma_trend_rows(histories: List[np.ndarray]) -> List[str]:
+        """
+        _latest_ma_trend for histories of any length at once.
+        
+        Each history's last 200 closes become a row of a (symbols x 200) matrix, NaN-padded
+        at the front, so a history too short for a window gets a NaN mean, which reads as
+        undefined just like the per-symbol check.
+        """
+        tails = np.full((len(histories), 200), np.nan)
+        for row, closes in zip(tails, histories):
+            tail = closes[-200:]
+            row[200 - len(tail):] = tail
+        sma_50 = tails[:, -50:].mean(axis=1)
+        sma_200 = tails.mean(axis=1)
+        return [TechnicalAnalysis._determine_trend(closes[-1], sma_50_last, sma_200_last)
+                for closes, sma_50_last, sma_200_last in zip(histories, sma_50, sma_200)]
+    
+    @staticmethod
+    def detect_patterns(df: PriceData) -> Dict[str, Any]:
+        """Detect common chart patterns."""
+        closes = HistoryBundle.of(df).close
+        n = len(closes)
+        
+        patterns_detected = []
+        
+        # Golden Cross / Death Cross (needs a defined SMA200 on the last two bars,
+        # so only the last two 50/200-bar window means are computed)
+        if n >= 201:
+            sma_50 = [closes[-51:-1].mean(), closes[-50:].mean()]
+            sma_200 = [closes[-201:-1].mean(), closes[-200:].mean()]
+            
             if sma_50[-2] < sma_200[-2] and sma_50[-1] > sma_200[-1]:
                 patterns_detected.append({
                     "pattern": "Golden Cross",
@@ -773,25 +1063,34 @@ class TechnicalAnalysis:
                     "signal": "Bearish"
                 })
         
-        # Bullish/Bearish trends
-        if len(recent_closes) >= 10:
-            if np.all(np.diff(recent_closes[-10:]) > 0):
-                patterns_detected.append({
-                    "pattern": "Strong Uptrend",
-                    "description": "Consistent upward movement in last 10 days",
-                    "signal": "Bullish"
-                })
-            elif np.all(np.diff(recent_closes[-10:]) < 0):
-                patterns_detected.append({
-                    "pattern": "Strong Downtrend",
-                    "description": "Consistent downward movement in last 10 days",
-                    "signal": "Bearish"
-                })
+        # Bullish/Bearish trends over the last 10 closes, and the last 20 closes' range
+        if _numba_available:
+            uptrend, downtrend, recent_var, overall_var = pattern_stats_kernel(closes, 10, 20)
+        else:
+            uptrend = downtrend = False
+            if n >= 10:
+                # Compare neighbours directly: no diff array, and NaN fails both tests
+                tail = closes[-10:]
+                uptrend = bool((tail[1:] > tail[:-1]).all())
+                downtrend = not uptrend and bool((tail[1:] < tail[:-1]).all())
+            recent_var = np.var(closes[-20:])
+            overall_var = np.var(closes)
+        
+        if uptrend:
+            patterns_detected.append({
+                "pattern": "Strong Uptrend",
+                "description": "Consistent upward movement in last 10 days",
+                "signal": "Bullish"
+            })
+        elif downtrend:
+            patterns_detected.append({
+                "pattern": "Strong Downtrend",
+                "description": "Consistent downward movement in last 10 days",
+                "signal": "Bearish"
+            })
         
-        # Consolidation
-        recent_std = np.std(recent_closes)
-        overall_std = np.std(closes)
-        if recent_std < overall_std * 0.5:
+        # Consolidation: recent std under half the overall std, compared as variances
+        if recent_var < overall_var * 0.25:
             patterns_detected.append({
                 "pattern": "Consolidation",
                 "description": "Price trading in narrow range",
@@ -800,5 +1099,5 @@ class TechnicalAnalysis:
         
         return {
             "patterns_found": len(patterns_detected),
-            "patterns": patterns_detected if patterns_detected else [{"pattern": "None", "description": "No clear patterns detected", "signal": "Neutral"}]
+            "patterns": patterns_detected if patterns_detected else list(_NO_PATTERNS)
         }
@@ -5,6 +5,9 @@ Fixes VWAP calculation to match TradingView behavior with proper daily reset
 Key Fix: VWAP now properly resets daily for daily charts, matching TradingView exactly
 """
 
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
 import yfinance as yf
 import pandas as pd
 import numpy as np
@@ -13,8 +16,149 @@ from typing import Dict, Any
 import warnings
 warnings.filterwarnings('ignore')
 
+from scipy.signal import lfilter
 
-def analyze_volume(ticker: str, period: str = "3mo", vwap_mode: str = "session") -> dict:
+from .cache import today_iso, ttl_cache
+from .history import get_history, get_histories
+from .ta_kernels import (
+    FUNDAMENTAL_COLUMNS, _numba_available, fundamental_scores_kernel, wilder_rma_kernel
+)
+
+# Alpaca market data for the intraday VWAP; the other tools work without it
+try:
+    from alpaca.data.historical import StockHistoricalDataClient
+    from alpaca.data.requests import StockBarsRequest
+    from alpaca.data.timeframe import TimeFrame, TimeFrameUnit
+    _alpaca_available = True
+except ImportError:
+    _alpaca_available = False
+
+# Optional C moving-window reductions for the volatility percentile
+try:
+    import bottleneck as bn  # type: ignore
+    _bottleneck_available = True
+except ImportError:
+    _bottleneck_available = False
+
+# Relative strength ladders: outperformance (%) above _RS_THRESHOLDS[i] scores _RS_SCORES[i + 1],
+# and an RS score at or above _RS_CLASS_FLOORS[i] is classified as _RS_CLASSES[i + 1]
+_RS_THRESHOLDS = np.array([-10, -5, -2, 0, 1, 3, 5, 7, 10, 15, 20])
+_RS_SCORES = (20, 30, 40, 50, 60, 70, 75, 80, 85, 90, 95, 99)
+_RS_CLASS_FLOORS = np.array([40, 60, 70, 80, 90])
+_RS_CLASSES = ("WEAK LAGGARD", "LAGGARD", "MARKET PERFORMER", "LEADER", "STRONG LEADER", "EXCEPTIONAL LEADER")
+
+# Fundamental score ladders, worst first: an F-Score at or above _F_SCORE_FLOORS[i] reads as
+# _F_SCORE_INTERPRETATIONS[i + 1], and a Z-Score above _Z_SCORE_CUTOFFS[i] is in _Z_ZONES[i + 1]
+# (with _BANKRUPTCY_RISKS[i + 1] and _Z_INTERPRETATIONS[i + 1])
+_F_SCORE_FLOORS = np.array([3, 5, 7])
+_F_SCORE_INTERPRETATIONS = ("POOR - Likely value trap", "WEAK - Questionable fundamentals",
+                            "GOOD - Decent fundamentals", "EXCELLENT - Strong fundamentals")
+# Altman Z-Score weights of x1..x5
+_Z_SCORE_WEIGHTS = np.array([1.2, 1.4, 3.3, 0.6, 1.0])
+_Z_SCORE_CUTOFFS = np.array([1.81, 2.99])
+_Z_ZONES = ("DISTRESS ZONE", "GREY ZONE", "SAFE ZONE")
+_BANKRUPTCY_RISKS = ("High", "Medium", "Low")
+_Z_INTERPRETATIONS = ("High distress - avoid", "Caution advised", "Financially strong")
+_OVERALL_ASSESSMENTS = ("AVOID - Poor fundamentals", "Proceed with caution", "Quality company", "STRONG BUY candidate")
+
+# Result sections analyze_volume / analyze_volatility can be limited to
+VOLUME_SECTIONS = ("vwap", "volume_profile", "relative_volume", "obv", "accumulation_distribution", "mfi",
+                   "price_volume_confirmation")
+VOLATILITY_SECTIONS = ("atr", "historical_volatility", "beta", "keltner_channels", "bollinger_band_width")
+
+
+# The only info fields the fundamental scores read
+_FUNDAMENTAL_INFO_FIELDS = ("marketCap", "sharesOutstanding")
+
+
+def _latest_periods(statement: pd.DataFrame) -> tuple[dict, dict]:
+    """
+    Line items of a statement's newest and previous periods (columns, newest first) as dicts.
+
+    With a single period the newest one is repeated; an empty statement gives two empty dicts.
+    """
+    if statement is None or statement.empty:
+        return {}, {}
+    latest = statement.iloc[:, 0].to_dict()
+    prev = statement.iloc[:, 1].to_dict() if len(statement.columns) > 1 else latest
+    return latest, prev
+
+
+@ttl_cache(maxsize=256, ttl=3600, disk_ttl=86400)
+def get_financials(ticker: str) -> tuple[tuple[dict, dict], tuple[dict, dict], tuple[dict, dict], dict]:
+    """
+    Newest and previous quarter of the balance sheet, income statement and cash flow, plus
+    the info fields the scores use.
+
+    Statements only change once a quarter, so they are cached for an hour in memory and a
+    day on disk. Only plain dicts of the periods read are kept, which keeps the cached
+    (and pickled) entries small. Treat the result as read-only.
+    """
+    stock = yf.Ticker(ticker)
+    info = stock.info
+    return (
+        _latest_periods(stock.quarterly_balance_sheet),
+        _latest_periods(stock.quarterly_income_stmt),
+        _latest_periods(stock.quarterly_cashflow),
+        {field: info[field] for field in _FUNDAMENTAL_INFO_FIELDS if field in info}
+    )
+
+
+def get_price_histories(tickers: list[str], period: str) -> dict[str, pd.DataFrame]:
+    """
+    Daily price histories from the shared history cache, fetching all cache misses in one
+    batched download. A ticker with no data maps to an empty frame.
+    """
+    histories = get_histories(tickers, period)
+    return {ticker: histories.get(ticker, pd.DataFrame()) for ticker in tickers}
+
+
+def _requested_sections(sections: list[str] | None, available: tuple[str, ...]) -> set[str]:
+    """The sections to compute: all of ``available`` unless a subset is requested."""
+    if not sections:
+        return set(available)
+    if invalid := set(sections) - set(available):
+        raise ValueError(f"Invalid sections: {sorted(invalid)}. Available: {list(available)}")
+    return set(sections)
+
+
+def _cumsum_skipna(values: np.ndarray) -> np.ndarray:
+    """
+    Running sum that skips NaN the way pandas' cumsum does.
+
+    A NaN entry stays NaN in the result but does not poison the entries after it.
+    """
+    total = np.nancumsum(values)
+    total[np.isnan(values)] = np.nan
+    return total
+
+
+def atr_wilder(tr: np.ndarray, period: int = 14) -> np.ndarray:
+    """
+    ATR using Wilder's smoothing (RMA) - TradingView method.
+
+    NaN for the first ``period`` bars, the mean of the first ``period`` true ranges at bar
+    ``period``, then ATR = (Previous ATR * (n-1) + Current TR) / n.
+    """
+    tr = np.ascontiguousarray(tr, dtype=np.float64)
+    out = np.full(len(tr), np.nan)
+    if len(tr) <= period:
+        return out
+    
+    # Missing true ranges are skipped in the seed average, as pandas' mean does
+    seed = np.nanmean(tr[:period])
+    if _numba_available:
+        return wilder_rma_kernel(tr, period, seed)
+    
+    # The recurrence is a one-pole IIR filter, so lfilter runs it in C
+    decay = (period - 1) / period
+    out[period] = seed
+    out[period + 1:] = lfilter([1. / period], [1., -decay], tr[period + 1:], zi=[seed * decay])[0]
+    return out
+
+
+def analyze_volume(ticker: str, period: str = "3mo", vwap_mode: str = "session",
+                   sections: list[str] | None = None) -> dict:
     """
     Comprehensive volume analysis - THE most important confirmation indicator.
     
@@ -25,169 +169,194 @@ def analyze_volume(ticker: str, period: str = "3mo", vwap_mode: str = "session")
             - "session": Each day's VWAP (TradingView default) - calculates VWAP per trading session
             - "rolling": 20-day rolling VWAP 
             - "anchored": VWAP from start of period (what TradingView calls "Anchored VWAP")
+        sections: Subset of VOLUME_SECTIONS to compute (default: all). Skipped sections
+            are left out of the result.
     
     Returns:
         Dictionary containing volume metrics
     """
     try:
-        stock = yf.Ticker(ticker)
-        df = stock.history(period=period)
+        wanted = _requested_sections(sections, VOLUME_SECTIONS)
+        # Shared cached frame: read its columns as arrays, never add to it
+        df = get_history(ticker, period)
         
         if df.empty:
             return {"error": f"No data available for {ticker}"}
         
-        # Calculate Typical Price = (High + Low + Close) / 3
-        df['Typical_Price'] = (df['High'] + df['Low'] + df['Close']) / 3
-        
-        # Calculate different VWAP modes
-        if vwap_mode == "session":
-            # TradingView default: Each bar on a daily chart represents one session's VWAP
-            # Since we have daily data, each row IS the session's VWAP
-            # For daily bars, VWAP = Typical Price (each bar is the full session)
-            df['VWAP'] = df['Typical_Price']
-            current_vwap = df['VWAP'].iloc[-1]
-            vwap_type = "Session VWAP (Daily)"
-            vwap_note = "For daily charts, each bar's typical price IS that day's VWAP. For true intraday VWAP matching TradingView's live calculation, use analyze_volume_intraday() with 15-min data."
-            
-        elif vwap_mode == "rolling":
-            # Rolling 20-day VWAP (commonly used for swing trading)
-            df['PV'] = df['Typical_Price'] * df['Volume']
-            df['VWAP'] = (
-                df['PV'].rolling(window=20).sum() / 
-                df['Volume'].rolling(window=20).sum()
-            )
-            current_vwap = df['VWAP'].iloc[-1]
-            vwap_type = "20-Day Rolling VWAP"
-            vwap_note = "Rolling VWAP useful for identifying intermediate-term support/resistance"
-            
-        else:  # anchored
-            # Anchored VWAP from start of period (what some call "cumulative")
-            # This is useful for longer-term position trades
-            df['PV'] = df['Typical_Price'] * df['Volume']
-            df['VWAP'] = df['PV'].cumsum() / df['Volume'].cumsum()
-            current_vwap = df['VWAP'].iloc[-1]
-            vwap_type = f"Anchored VWAP (from start of {period})"
-            vwap_note = "Anchored VWAP from period start - useful for position trading"
-        
-        current_price = df['Close'].iloc[-1]
-        vwap_distance = ((current_price - current_vwap) / current_vwap) * 100
-        
-        # Volume Profile - Find Point of Control (POC)
-        price_bins = 20
-        df['Price_Bin'] = pd.cut(df['Close'], bins=price_bins)
-        volume_profile = df.groupby('Price_Bin')['Volume'].sum().sort_values(ascending=False)
-        poc_bin = volume_profile.index[0]
-        poc_price = (poc_bin.left + poc_bin.right) / 2
-        
-        # Value Area (70% of volume)
-        total_volume = df['Volume'].sum()
-        cumsum_volume = volume_profile.cumsum()
-        value_area_mask = cumsum_volume <= total_volume * 0.70
-        value_area_high = volume_profile[value_area_mask].index[0].right if value_area_mask.any() else df['High'].max()
-        value_area_low = volume_profile[value_area_mask].index[-1].left if value_area_mask.any() else df['Low'].min()
-        
-        # Relative Volume
-        avg_volume = df['Volume'].tail(20).mean()
-        current_volume = df['Volume'].iloc[-1]
-        relative_volume = current_volume / avg_volume if avg_volume > 0 else 0
+        # Work on NumPy arrays: every indicator below is a cumulative or windowed sum
+        high = df['High'].to_numpy(dtype=float)
+        low = df['Low'].to_numpy(dtype=float)
+        close = df['Close'].to_numpy(dtype=float)
+        volume = df['Volume'].to_numpy(dtype=float)
+        current_price = close[-1]
         
-        # OBV (On-Balance Volume)
-        df['OBV_Change'] = 0
-        df.loc[df['Close'] > df['Close'].shift(1), 'OBV_Change'] = df['Volume']
-        df.loc[df['Close'] < df['Close'].shift(1), 'OBV_Change'] = -df['Volume']
-        df['OBV'] = df['OBV_Change'].cumsum()
-        obv_current = df['OBV'].iloc[-1]
-        obv_20_ago = df['OBV'].iloc[-20] if len(df) >= 20 else df['OBV'].iloc[0]
-        obv_trend = "Accumulation" if obv_current > obv_20_ago else "Distribution"
-        
-        # MFI (Money Flow Index) - RSI of money flow
-        typical_price = df['Typical_Price']
-        money_flow = typical_price * df['Volume']
-        
-        # Positive and negative money flow
-        df['Price_Change'] = typical_price.diff()
-        positive_flow = money_flow.where(df['Price_Change'] > 0, 0).rolling(14).sum()
-        negative_flow = money_flow.where(df['Price_Change'] < 0, 0).rolling(14).sum()
-        
-        # Avoid division by zero
-        negative_flow = negative_flow.replace(0, 0.001)
-        money_ratio = positive_flow / negative_flow
-        mfi = 100 - (100 / (1 + money_ratio))
-        current_mfi = mfi.iloc[-1]
-        
-        # MFI Signal
-        if current_mfi > 80:
-            mfi_signal = "Overbought - Possible Reversal"
-        elif current_mfi < 20:
-            mfi_signal = "Oversold - Possible Reversal"
-        else:
-            mfi_signal = "Neutral"
-        
-        # Accumulation/Distribution Line
-        df['CLV'] = ((df['Close'] - df['Low']) - (df['High'] - df['Close'])) / (df['High'] - df['Low'])
-        df['CLV'] = df['CLV'].fillna(0)  # Handle days where High = Low
-        df['AD_Line'] = (df['CLV'] * df['Volume']).cumsum()
-        ad_current = df['AD_Line'].iloc[-1]
-        ad_20_ago = df['AD_Line'].iloc[-20] if len(df) >= 20 else df['AD_Line'].iloc[0]
-        ad_trend = "Accumulation" if ad_current > ad_20_ago else "Distribution"
-        
-        # Price-Volume Confirmation
-        recent_price_change = ((df['Close'].iloc[-1] - df['Close'].iloc[-5]) / df['Close'].iloc[-5]) * 100 if len(df) >= 5 else 0
-        if recent_price_change > 2 and relative_volume > 1.5:
-            confirmation = "STRONG BULLISH - Price surge confirmed by high volume"
-        elif recent_price_change > 2 and relative_volume < 1.0:
-            confirmation = "WEAK BULLISH - Price surge NOT confirmed (low volume warning)"
-        elif recent_price_change < -2 and relative_volume > 1.5:
-            confirmation = "STRONG BEARISH - Decline confirmed by high volume"
-        elif recent_price_change < -2 and relative_volume < 1.0:
-            confirmation = "WEAK BEARISH - Decline on low volume (possible reversal)"
-        else:
-            confirmation = "NEUTRAL - No significant price/volume divergence"
-        
-        # Volume surges and dry-ups
-        volume_2x = df[df['Volume'] > avg_volume * 2].tail(5)
-        volume_surge_dates = volume_2x.index.strftime('%Y-%m-%d').tolist() if len(volume_2x) > 0 else []
-        
-        volume_dry = df[df['Volume'] < avg_volume * 0.5].tail(5)
-        volume_dryup_dates = volume_dry.index.strftime('%Y-%m-%d').tolist() if len(volume_dry) > 0 else []
+        # Calculate Typical Price = (High + Low + Close) / 3
+        typical_price = (high + low + close) / 3
+        price_volume = typical_price * volume
         
-        return {
+        result = {
             "ticker": ticker,
-            "analysis_date": datetime.now().strftime("%Y-%m-%d"),
+            "analysis_date": today_iso(),
             "current_price": round(current_price, 2),
-            "vwap": round(current_vwap, 2),
-            "vwap_type": vwap_type,
-            "vwap_mode": vwap_mode,
-            "vwap_distance_%": round(vwap_distance, 2),
-            "vwap_interpretation": "Above VWAP (bullish)" if vwap_distance > 0 else "Below VWAP (bearish)",
-            "volume_profile": {
+        }
+        
+        if "vwap" in wanted:
+            # Calculate different VWAP modes
+            if vwap_mode == "session":
+                # TradingView default: Each bar on a daily chart represents one session's VWAP
+                # Since we have daily data, each row IS the session's VWAP
+                # For daily bars, VWAP = Typical Price (each bar is the full session)
+                current_vwap = typical_price[-1]
+                vwap_type = "Session VWAP (Daily)"
+                vwap_note = "For daily charts, each bar's typical price IS that day's VWAP. For true intraday VWAP matching TradingView's live calculation, use analyze_volume_intraday() with 15-min data."
+                
+            elif vwap_mode == "rolling":
+                # Rolling 20-day VWAP (commonly used for swing trading)
+                # Only the latest window is reported
+                current_vwap = price_volume[-20:].sum() / volume[-20:].sum() if len(df) >= 20 else np.nan
+                vwap_type = "20-Day Rolling VWAP"
+                vwap_note = "Rolling VWAP useful for identifying intermediate-term support/resistance"
+                
+            else:  # anchored
+                # Anchored VWAP from start of period (what some call "cumulative")
+                # This is useful for longer-term position trades; like a cumsum, bars with a
+                # missing price or volume are skipped rather than poisoning the total
+                current_vwap = np.nansum(price_volume) / np.nansum(volume)
+                vwap_type = f"Anchored VWAP (from start of {period})"
+                vwap_note = "Anchored VWAP from period start - useful for position trading"
+            
+            vwap_distance = ((current_price - current_vwap) / current_vwap) * 100
+            result.update({
+                "vwap": round(current_vwap, 2),
+                "vwap_type": vwap_type,
+                "vwap_mode": vwap_mode,
+                "vwap_distance_%": round(vwap_distance, 2),
+                "vwap_interpretation": "Above VWAP (bullish)" if vwap_distance > 0 else "Below VWAP (bearish)",
+            })
+        
+        if "volume_profile" in wanted:
+            # Volume Profile - Find Point of Control (POC)
+            # Volume-weighted histogram of closes over equal-width price bins
+            price_bins = 20
+            # Bins span every close; a missing volume counts as none, as groupby's sum skipped it
+            valid = ~np.isnan(close)
+            volume_by_bin, bin_edges = np.histogram(close[valid], bins=price_bins,
+                                                    weights=np.nan_to_num(volume[valid]))
+            order = np.argsort(-volume_by_bin, kind='stable')
+            poc_price = (bin_edges[order[0]] + bin_edges[order[0] + 1]) / 2
+            
+            # Value Area (70% of volume): span of the busiest bins that together hold it
+            value_area_bins = order[volume_by_bin[order].cumsum() <= volume_by_bin.sum() * 0.70]
+            value_area_high = bin_edges[value_area_bins + 1].max() if len(value_area_bins) else df['High'].max()
+            value_area_low = bin_edges[value_area_bins].min() if len(value_area_bins) else df['Low'].min()
+            
+            result["volume_profile"] = {
                 "poc_price": round(poc_price, 2),
                 "value_area_high": round(value_area_high, 2),
                 "value_area_low": round(value_area_low, 2),
                 "poc_vs_price": "Price above POC" if current_price > poc_price else "Price below POC"
-            },
-            "current_volume": int(current_volume),
-            "avg_volume_20d": int(avg_volume),
-            "relative_volume": round(relative_volume, 2),
-            "relative_volume_interpretation": 
-                "VERY HIGH (2x+ average)" if relative_volume > 2.0 else
-                "HIGH (1.5x+ average)" if relative_volume > 1.5 else
-                "Above Average" if relative_volume > 1.0 else
-                "Below Average" if relative_volume > 0.7 else
-                "VERY LOW (caution)",
-            "volume_surges_recent": volume_surge_dates,
-            "volume_dryups_recent": volume_dryup_dates,
-            "obv_trend": obv_trend,
-            "accumulation_distribution_trend": ad_trend,
-            "mfi": round(current_mfi, 2),
-            "mfi_signal": mfi_signal,
-            "price_volume_confirmation": confirmation,
-            "professional_note": vwap_note
-        }
+            }
+        
+        # Relative Volume (also feeds the price-volume confirmation)
+        avg_volume = np.nanmean(volume[-20:])
+        current_volume = volume[-1]
+        relative_volume = current_volume / avg_volume if avg_volume > 0 else 0
+        
+        if "relative_volume" in wanted:
+            # Volume surges and dry-ups
+            volume_2x = df.index[volume > avg_volume * 2][-5:]
+            volume_surge_dates = volume_2x.strftime('%Y-%m-%d').tolist() if len(volume_2x) > 0 else []
+            
+            volume_dry = df.index[volume < avg_volume * 0.5][-5:]
+            volume_dryup_dates = volume_dry.strftime('%Y-%m-%d').tolist() if len(volume_dry) > 0 else []
+            
+            result.update({
+                "current_volume": int(current_volume),
+                "avg_volume_20d": int(avg_volume),
+                "relative_volume": round(relative_volume, 2),
+                "relative_volume_interpretation": 
+                    "VERY HIGH (2x+ average)" if relative_volume > 2.0 else
+                    "HIGH (1.5x+ average)" if relative_volume > 1.5 else
+                    "Above Average" if relative_volume > 1.0 else
+                    "Below Average" if relative_volume > 0.7 else
+                    "VERY LOW (caution)",
+                "volume_surges_recent": volume_surge_dates,
+                "volume_dryups_recent": volume_dryup_dates,
+            })
+        
+        if "obv" in wanted:
+            # OBV (On-Balance Volume)
+            close_change = np.diff(close, prepend=np.nan)
+            obv = _cumsum_skipna(np.where(close_change > 0, volume, np.where(close_change < 0, -volume, 0)))
+            obv_current = obv[-1]
+            obv_20_ago = obv[-20] if len(obv) >= 20 else obv[0]
+            result["obv_trend"] = "Accumulation" if obv_current > obv_20_ago else "Distribution"
+        
+        if "accumulation_distribution" in wanted:
+            # Accumulation/Distribution Line
+            with np.errstate(divide='ignore', invalid='ignore'):
+                clv = ((close - low) - (high - close)) / (high - low)
+            clv = np.nan_to_num(clv, nan=0.0, posinf=np.inf, neginf=-np.inf)  # Handle days where High = Low
+            ad_line = _cumsum_skipna(clv * volume)
+            ad_current = ad_line[-1]
+            ad_20_ago = ad_line[-20] if len(ad_line) >= 20 else ad_line[0]
+            result["accumulation_distribution_trend"] = "Accumulation" if ad_current > ad_20_ago else "Distribution"
+        
+        if "mfi" in wanted:
+            # MFI (Money Flow Index) - RSI of money flow over the last 14 bars
+            price_change = np.diff(typical_price, prepend=np.nan)
+            if len(price_volume) >= 14:
+                positive_flow = np.where(price_change > 0, price_volume, 0)[-14:].sum()
+                negative_flow = np.where(price_change < 0, price_volume, 0)[-14:].sum()
+                
+                # Avoid division by zero
+                if negative_flow == 0:
+                    negative_flow = 0.001
+                money_ratio = positive_flow / negative_flow
+                current_mfi = 100 - (100 / (1 + money_ratio))
+            else:
+                current_mfi = np.nan
+            
+            # MFI Signal
+            if current_mfi > 80:
+                mfi_signal = "Overbought - Possible Reversal"
+            elif current_mfi < 20:
+                mfi_signal = "Oversold - Possible Reversal"
+            else:
+                mfi_signal = "Neutral"
+            
+            result["mfi"] = round(current_mfi, 2)
+            result["mfi_signal"] = mfi_signal
+        
+        if "price_volume_confirmation" in wanted:
+            # Price-Volume Confirmation
+            recent_price_change = ((close[-1] - close[-5]) / close[-5]) * 100 if len(close) >= 5 else 0
+            if recent_price_change > 2 and relative_volume > 1.5:
+                confirmation = "STRONG BULLISH - Price surge confirmed by high volume"
+            elif recent_price_change > 2 and relative_volume < 1.0:
+                confirmation = "WEAK BULLISH - Price surge NOT confirmed (low volume warning)"
+            elif recent_price_change < -2 and relative_volume > 1.5:
+                confirmation = "STRONG BEARISH - Decline confirmed by high volume"
+            elif recent_price_change < -2 and relative_volume < 1.0:
+                confirmation = "WEAK BEARISH - Decline on low volume (possible reversal)"
+            else:
+                confirmation = "NEUTRAL - No significant price/volume divergence"
+            result["price_volume_confirmation"] = confirmation
+        
+        if "vwap" in wanted:
+            result["professional_note"] = vwap_note
+        
+        return result
     except Exception as e:
         return {"error": str(e), "ticker": ticker}
 
 
+@functools.lru_cache(maxsize=4)
+def _alpaca_client(api_key: str, api_secret: str):
+    """One Alpaca market-data client per credential pair, so its HTTP session is reused."""
+    return StockHistoricalDataClient(api_key, api_secret)
+
+
 def analyze_volume_intraday(ticker: str, window: int = 100) -> dict:
     """
     Calculate TRUE intraday VWAP like TradingView using 15-minute bars.
@@ -201,10 +370,8 @@ def analyze_volume_intraday(ticker: str, window: int = 100) -> dict:
         Dictionary with today's true intraday VWAP
     """
     try:
-        from alpaca.data.timeframe import TimeFrame, TimeFrameUnit
-        from alpaca.data.historical import StockHistoricalDataClient
-        from alpaca.data.requests import StockBarsRequest
-        import os
+        if not _alpaca_available:
+            return {"error": "alpaca-py is not installed", "ticker": ticker}
         
         api_key = os.getenv('ALPACA_API_KEY')
         api_secret = os.getenv('ALPACA_API_SECRET')
@@ -214,7 +381,7 @@ def analyze_volume_intraday(ticker: str, window: int = 100) -> dict:
         
         # Fetch 15-minute intraday bars
         timeframe = TimeFrame(15, TimeFrameUnit.Minute)
-        client = StockHistoricalDataClient(api_key, api_secret)
+        client = _alpaca_client(api_key, api_secret)
         request = StockBarsRequest(
             symbol_or_symbols=ticker,
             timeframe=timeframe,
@@ -230,31 +397,35 @@ def analyze_volume_intraday(ticker: str, window: int = 100) -> dict:
         df_raw.index = df_raw.index.get_level_values('timestamp').tz_convert("America/New_York")
         
         # Get today's data only (THIS IS THE KEY - DAILY RESET)
-        today = pd.Timestamp.now(tz='America/New_York').date()
-        df_today = df_raw[df_raw.index.date == today].copy()
-        
-        if df_today.empty:
+        # Compare against today's Eastern-time midnights rather than building a date per bar
+        session_start = pd.Timestamp.now(tz='America/New_York').normalize()
+        session_end = session_start + pd.DateOffset(days=1)
+        today = session_start.date()
+        # Only the session's columns are needed, so mask the arrays rather than copying the frame
+        today_mask = (df_raw.index >= session_start) & (df_raw.index < session_end)
+        
+        if not today_mask.any():
             return {"error": "No data for today yet (market may not be open)"}
         
-        # Calculate VWAP correctly: Typical Price * Volume, cumulative for TODAY ONLY
-        df_today['Typical_Price'] = (df_today['high'] + df_today['low'] + df_today['close']) / 3
-        df_today['TP_Volume'] = df_today['Typical_Price'] * df_today['volume']
+        high = df_raw['high'].to_numpy(dtype=np.float64)[today_mask]
+        low = df_raw['low'].to_numpy(dtype=np.float64)[today_mask]
+        close = df_raw['close'].to_numpy(dtype=np.float64)[today_mask]
+        volume = df_raw['volume'].to_numpy(dtype=np.float64)[today_mask]
         
-        # Calculate cumulative VWAP for today's session
-        df_today['Cumulative_TPV'] = df_today['TP_Volume'].cumsum()
-        df_today['Cumulative_Volume'] = df_today['volume'].cumsum()
-        df_today['VWAP'] = df_today['Cumulative_TPV'] / df_today['Cumulative_Volume']
+        # Calculate VWAP correctly: Typical Price * Volume, cumulative for TODAY ONLY
+        typical_price = (high + low + close) / 3
+        cumulative_volume = _cumsum_skipna(volume)
+        vwap = _cumsum_skipna(typical_price * volume) / cumulative_volume
         
         # Current values
-        vwap_today = df_today['VWAP'].iloc[-1]
-        current_price = df_today['close'].iloc[-1]
+        vwap_today = vwap[-1]
+        current_price = close[-1]
         vwap_distance = ((current_price - vwap_today) / vwap_today) * 100
         
         # VWAP standard deviation bands (like Bollinger Bands for VWAP)
-        df_today['Price_Dev'] = df_today['Typical_Price'] - df_today['VWAP']
-        df_today['Squared_Dev'] = df_today['Price_Dev'] ** 2
-        variance = (df_today['Squared_Dev'] * df_today['volume']).cumsum() / df_today['Cumulative_Volume']
-        std_dev = np.sqrt(variance.iloc[-1])
+        # Volume-weighted squared distance of each bar from the VWAP as it stood at that bar
+        variance = np.nansum((typical_price - vwap) ** 2 * volume) / cumulative_volume[-1]
+        std_dev = np.sqrt(variance)
         
         vwap_upper_1 = vwap_today + std_dev
         vwap_lower_1 = vwap_today - std_dev
@@ -276,7 +447,7 @@ def analyze_volume_intraday(ticker: str, window: int = 100) -> dict:
         return {
             "ticker": ticker,
             "date": str(today),
-            "current_time": df_today.index[-1].strftime("%Y-%m-%d %H:%M:%S %Z"),
+            "current_time": df_raw.index[today_mask][-1].strftime("%Y-%m-%d %H:%M:%S %Z"),
             "current_price": round(current_price, 2),
             "vwap_intraday": round(vwap_today, 2),
             "vwap_distance_%": round(vwap_distance, 2),
@@ -289,9 +460,9 @@ def analyze_volume_intraday(ticker: str, window: int = 100) -> dict:
                 "lower_2_stddev": round(vwap_lower_2, 2)
             },
             "band_position": band_position,
-            "bars_analyzed": len(df_today),
-            "session_high": round(df_today['high'].max(), 2),
-            "session_low": round(df_today['low'].min(), 2),
+            "bars_analyzed": len(close),
+            "session_high": round(np.nanmax(high), 2),
+            "session_low": round(np.nanmin(low), 2),
             "interpretation": "Above VWAP (bullish intraday)" if vwap_distance > 0 else "Below VWAP (bearish intraday)",
             "trading_note": "This EXACTLY matches TradingView's VWAP - resets daily, uses intraday data"
         }
@@ -300,7 +471,7 @@ def analyze_volume_intraday(ticker: str, window: int = 100) -> dict:
         return {"error": str(e), "ticker": ticker}
 
 
-def analyze_volatility(ticker: str, period: str = "6mo") -> dict:
+def analyze_volatility(ticker: str, period: str = "6mo", sections: list[str] | None = None) -> dict:
     """
     Comprehensive volatility analysis for risk management.
     ATR is THE professional standard for stop placement.
@@ -308,161 +479,172 @@ def analyze_volatility(ticker: str, period: str = "6mo") -> dict:
     Args:
         ticker: Stock ticker symbol
         period: Historical period (3mo, 6mo, 1y, 2y)
+        sections: Subset of VOLATILITY_SECTIONS to compute (default: all). Skipped sections
+            are left out of the result; without "beta" SPY is not fetched.
     
     Returns:
         Dictionary containing volatility metrics
     """
     try:
-        stock = yf.Ticker(ticker)
-        df = stock.history(period=period)
-        spy = yf.Ticker("SPY").history(period=period)
+        wanted = _requested_sections(sections, VOLATILITY_SECTIONS)
+        histories = get_price_histories([ticker, "SPY"] if "beta" in wanted else [ticker], period)
+        # Shared cached frame: read its columns as arrays, never add to it
+        df = histories[ticker]
         
         if df.empty:
             return {"error": f"No data available for {ticker}"}
         
-        # ATR (Average True Range) - THE standard for stops
-        # Calculate True Range
-        df['H-L'] = df['High'] - df['Low']
-        df['H-PC'] = abs(df['High'] - df['Close'].shift(1))
-        df['L-PC'] = abs(df['Low'] - df['Close'].shift(1))
-        df['TR'] = df[['H-L', 'H-PC', 'L-PC']].max(axis=1)
-        
-        # ATR using Wilder's smoothing (RMA) - matches TradingView
-        # Formula: ATR = (Previous ATR * (n-1) + Current TR) / n
-        def calculate_atr_wilder(tr_series, period=14):
-            """Calculate ATR using Wilder's smoothing (RMA) - TradingView method"""
-            atr_values = []
-            for i in range(len(tr_series)):
-                if i < period:
-                    # Not enough data yet
-                    atr_values.append(np.nan)
-                elif i == period:
-                    # First ATR is simple average of first n periods
-                    atr_values.append(tr_series.iloc[:period].mean())
-                else:
-                    # Subsequent ATRs use Wilder's smoothing
-                    prev_atr = atr_values[-1]
-                    current_tr = tr_series.iloc[i]
-                    new_atr = (prev_atr * (period - 1) + current_tr) / period
-                    atr_values.append(new_atr)
-            return pd.Series(atr_values, index=tr_series.index)
-        
-        df['ATR_14'] = calculate_atr_wilder(df['TR'], 14)
-        df['ATR_20'] = calculate_atr_wilder(df['TR'], 20)
-        
-        current_atr_14 = df['ATR_14'].iloc[-1]
-        current_atr_20 = df['ATR_20'].iloc[-1]
-        current_price = df['Close'].iloc[-1]
-        atr_pct_14 = (current_atr_14 / current_price) * 100
-        atr_pct_20 = (current_atr_20 / current_price) * 100
-        
-        # Historical Volatility (annualized)
-        df['Returns'] = df['Close'].pct_change()
-        hv_10d = df['Returns'].tail(10).std() * np.sqrt(252) * 100
-        hv_20d = df['Returns'].tail(20).std() * np.sqrt(252) * 100
-        hv_30d = df['Returns'].tail(30).std() * np.sqrt(252) * 100
-        hv_60d = df['Returns'].tail(60).std() * np.sqrt(252) * 100
-        
-        # Volatility Percentile (current vs 1-year)
-        one_year_hvs = df['Returns'].rolling(20).std().tail(252) * np.sqrt(252) * 100
-        current_hv = hv_20d
-        percentile = (one_year_hvs < current_hv).sum() / len(one_year_hvs.dropna()) * 100 if len(one_year_hvs.dropna()) > 0 else 50
-        
-        # Volatility Regime
-        if percentile > 80:
-            vol_regime = "EXTREME HIGH"
-        elif percentile > 60:
-            vol_regime = "HIGH"
-        elif percentile > 40:
-            vol_regime = "NORMAL"
-        elif percentile > 20:
-            vol_regime = "LOW"
-        else:
-            vol_regime = "EXTREME LOW"
-        
-        # Beta vs SPY
-        if not spy.empty:
-            combined = pd.merge(df[['Close']], spy[['Close']], 
-                              left_index=True, right_index=True, suffixes=('_stock', '_spy'))
-            combined['Returns_Stock'] = combined['Close_stock'].pct_change()
-            combined['Returns_SPY'] = combined['Close_spy'].pct_change()
-            covariance = combined['Returns_Stock'].cov(combined['Returns_SPY'])
-            spy_variance = combined['Returns_SPY'].var()
-            beta = covariance / spy_variance if spy_variance != 0 else 1.0
-        else:
-            beta = 1.0
-        
-        # Beta interpretation
-        if beta > 1.5:
-            beta_interp = "Very High Volatility vs Market"
-        elif beta > 1.0:
-            beta_interp = "Higher Volatility than Market"
-        elif beta > 0.5:
-            beta_interp = "Lower Volatility than Market"
-        else:
-            beta_interp = "Much Lower Volatility than Market"
-        
-        # Keltner Channels (ATR-based bands)
-        df['EMA_20'] = df['Close'].ewm(span=20).mean()
-        df['Keltner_Upper'] = df['EMA_20'] + (2 * df['ATR_20'])
-        df['Keltner_Lower'] = df['EMA_20'] - (2 * df['ATR_20'])
-        keltner_upper = df['Keltner_Upper'].iloc[-1]
-        keltner_lower = df['Keltner_Lower'].iloc[-1]
-        
-        # Bollinger Band Width (volatility indicator)
-        df['BB_Middle'] = df['Close'].rolling(20).mean()
-        df['BB_Std'] = df['Close'].rolling(20).std()
-        df['BB_Upper'] = df['BB_Middle'] + (2 * df['BB_Std'])
-        df['BB_Lower'] = df['BB_Middle'] - (2 * df['BB_Std'])
-        df['BB_Width'] = (df['BB_Upper'] - df['BB_Lower']) / df['BB_Middle']
-        bb_width = df['BB_Width'].iloc[-1] * 100
-        
-        # ATR-based stop recommendations (PROFESSIONAL STANDARD)
-        stop_2x_atr = round(current_price - (current_atr_14 * 2), 2)
-        stop_2_5x_atr = round(current_price - (current_atr_14 * 2.5), 2)
-        stop_3x_atr = round(current_price - (current_atr_14 * 3), 2)
-        
-        # ATR-based position sizing (1% risk rule)
-        # Example: If account = $100k, risk 1% = $1000
-        # Risk per share = 2.5x ATR
-        # Shares = $1000 / (2.5 * ATR)
-        risk_per_share_2_5x = current_atr_14 * 2.5
-        
-        return {
+        close = df['Close'].to_numpy(dtype=np.float64)
+        current_price = close[-1]
+        result = {
             "ticker": ticker,
             "current_price": round(current_price, 2),
-            "atr_14": round(current_atr_14, 2),
-            "atr_20": round(current_atr_20, 2),
-            "atr_14_%_of_price": round(atr_pct_14, 2),
-            "atr_20_%_of_price": round(atr_pct_20, 2),
-            "historical_volatility": {
-                "10_day_%": round(hv_10d, 2),
-                "20_day_%": round(hv_20d, 2),
-                "30_day_%": round(hv_30d, 2),
-                "60_day_%": round(hv_60d, 2)
-            },
-            "volatility_percentile": round(percentile, 1),
-            "volatility_regime": vol_regime,
-            "beta_vs_spy": round(beta, 2),
-            "beta_interpretation": beta_interp,
-            "keltner_channels": {
+        }
+        
+        if wanted & {"atr", "keltner_channels"}:
+            # ATR (Average True Range) - THE standard for stops
+            # Calculate True Range; fmax skips a missing previous close like pandas' row max
+            high = df['High'].to_numpy(dtype=np.float64)
+            low = df['Low'].to_numpy(dtype=np.float64)
+            prev_close = np.concatenate(([np.nan], close[:-1]))
+            tr = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+            
+            # ATR using Wilder's smoothing (RMA) - matches TradingView
+            current_atr_14 = atr_wilder(tr, 14)[-1]
+            current_atr_20 = atr_wilder(tr, 20)[-1]
+        
+        if "atr" in wanted:
+            atr_pct_14 = (current_atr_14 / current_price) * 100
+            atr_pct_20 = (current_atr_20 / current_price) * 100
+            result.update({
+                "atr_14": round(current_atr_14, 2),
+                "atr_20": round(current_atr_20, 2),
+                "atr_14_%_of_price": round(atr_pct_14, 2),
+                "atr_20_%_of_price": round(atr_pct_20, 2),
+            })
+        
+        if "historical_volatility" in wanted:
+            # Historical Volatility (annualized)
+            # Daily returns, computed once and shared by every window below
+            returns = np.empty_like(close)
+            returns[0] = np.nan
+            returns[1:] = np.diff(close) / close[:-1]
+            annualize = np.sqrt(252) * 100
+            hv_10d, hv_20d, hv_30d, hv_60d = (np.nanstd(returns[-n:], ddof=1) * annualize for n in (10, 20, 30, 60))
+            
+            # Volatility Percentile (current vs 1-year)
+            if _bottleneck_available and len(returns) >= 20:
+                rolling_hv = bn.move_std(returns, 20, min_count=20, ddof=1)
+            else:
+                rolling_hv = pd.Series(returns).rolling(20).std().to_numpy()
+            one_year_hvs = rolling_hv[-252:] * annualize
+            # Rank against the rolling series' own latest window so it never counts itself
+            current_hv = one_year_hvs[-1] if not np.isnan(one_year_hvs[-1]) else hv_20d
+            valid_hvs = np.count_nonzero(~np.isnan(one_year_hvs))
+            percentile = np.count_nonzero(one_year_hvs < current_hv) / valid_hvs * 100 if valid_hvs > 0 else 50
+            
+            # Volatility Regime
+            if percentile > 80:
+                vol_regime = "EXTREME HIGH"
+            elif percentile > 60:
+                vol_regime = "HIGH"
+            elif percentile > 40:
+                vol_regime = "NORMAL"
+            elif percentile > 20:
+                vol_regime = "LOW"
+            else:
+                vol_regime = "EXTREME LOW"
+            
+            result.update({
+                "historical_volatility": {
+                    "10_day_%": round(hv_10d, 2),
+                    "20_day_%": round(hv_20d, 2),
+                    "30_day_%": round(hv_30d, 2),
+                    "60_day_%": round(hv_60d, 2)
+                },
+                "volatility_percentile": round(percentile, 1),
+                "volatility_regime": vol_regime,
+            })
+        
+        if "beta" in wanted:
+            # Beta vs SPY, from the daily returns on the dates both series share
+            spy = histories["SPY"]
+            if not spy.empty:
+                dates = df.index.intersection(spy.index)
+                stock_close = df['Close'].reindex(dates).to_numpy(dtype=np.float64)
+                spy_close = spy['Close'].reindex(dates).to_numpy(dtype=np.float64)
+                stock_returns = np.diff(stock_close) / stock_close[:-1]
+                spy_returns = np.diff(spy_close) / spy_close[:-1]
+                paired = ~(np.isnan(stock_returns) | np.isnan(spy_returns))
+                covariance = np.cov(stock_returns[paired], spy_returns[paired])[0, 1]
+                # SPY's variance over all of its returns, not just the ones paired with the stock's
+                spy_variance = np.nanvar(spy_returns, ddof=1)
+                beta = covariance / spy_variance if spy_variance != 0 else 1.0
+            else:
+                beta = 1.0
+            
+            # Beta interpretation
+            if beta > 1.5:
+                beta_interp = "Very High Volatility vs Market"
+            elif beta > 1.0:
+                beta_interp = "Higher Volatility than Market"
+            elif beta > 0.5:
+                beta_interp = "Lower Volatility than Market"
+            else:
+                beta_interp = "Much Lower Volatility than Market"
+            
+            result["beta_vs_spy"] = round(beta, 2)
+            result["beta_interpretation"] = beta_interp
+        
+        if "keltner_channels" in wanted:
+            # Keltner Channels (ATR-based bands)
+            ema_20 = df['Close'].ewm(span=20).mean().to_numpy()[-1]
+            keltner_upper = ema_20 + (2 * current_atr_20)
+            keltner_lower = ema_20 - (2 * current_atr_20)
+            result["keltner_channels"] = {
                 "upper": round(keltner_upper, 2),
-                "middle": round(df['EMA_20'].iloc[-1], 2),
+                "middle": round(ema_20, 2),
                 "lower": round(keltner_lower, 2)
-            },
-            "bollinger_band_width_%": round(bb_width, 2),
-            "stop_loss_recommendations": {
-                "aggressive_2x_atr": stop_2x_atr,
-                "standard_2.5x_atr": stop_2_5x_atr,
-                "conservative_3x_atr": stop_3x_atr,
-                "note": "2.5x ATR is professional standard"
-            },
-            "position_sizing_example": {
-                "risk_per_share_2.5x_atr": round(risk_per_share_2_5x, 2),
-                "formula": "Shares = (Account_Size * Risk_%) / (2.5 * ATR)",
-                "example": f"For $100k account, 1% risk: {int(1000/risk_per_share_2_5x)} shares"
             }
-        }
+        
+        if "bollinger_band_width" in wanted:
+            # Bollinger Band Width (volatility indicator) - only the latest 20-bar window is reported
+            last_20 = close[-20:]
+            if len(last_20) == 20:
+                bb_middle = last_20.mean()
+                bb_std = last_20.std(ddof=1)
+                bb_width = ((bb_middle + 2 * bb_std) - (bb_middle - 2 * bb_std)) / bb_middle * 100
+            else:
+                bb_width = np.nan
+            result["bollinger_band_width_%"] = round(bb_width, 2)
+        
+        if "atr" in wanted:
+            # ATR-based stop recommendations (PROFESSIONAL STANDARD)
+            stop_2x_atr = round(current_price - (current_atr_14 * 2), 2)
+            stop_2_5x_atr = round(current_price - (current_atr_14 * 2.5), 2)
+            stop_3x_atr = round(current_price - (current_atr_14 * 3), 2)
+            
+            # ATR-based position sizing (1% risk rule)
+            # Example: If account = $100k, risk 1% = $1000
+            # Risk per share = 2.5x ATR
+            # Shares = $1000 / (2.5 * ATR)
+            risk_per_share_2_5x = current_atr_14 * 2.5
+            
+            result.update({
+                "stop_loss_recommendations": {
+                    "aggressive_2x_atr": stop_2x_atr,
+                    "standard_2.5x_atr": stop_2_5x_atr,
+                    "conservative_3x_atr": stop_3x_atr,
+                    "note": "2.5x ATR is professional standard"
+                },
+                "position_sizing_example": {
+                    "risk_per_share_2.5x_atr": round(risk_per_share_2_5x, 2),
+                    "formula": "Shares = (Account_Size * Risk_%) / (2.5 * ATR)",
+                    "example": f"For $100k account, 1% risk: {int(1000/risk_per_share_2_5x)} shares"
+                }
+            })
+        
+        return result
     except Exception as e:
         return {"error": str(e), "ticker": ticker}
 
@@ -481,69 +663,42 @@ def calculate_relative_strength(ticker: str, benchmark: str = "SPY", period: str
         Dictionary containing RS metrics
     """
     try:
-        stock = yf.Ticker(ticker).history(period=period)
-        bench = yf.Ticker(benchmark).history(period=period)
+        histories = get_price_histories([ticker, benchmark], period)
+        stock = histories[ticker]
+        bench = histories[benchmark]
         
         if stock.empty or bench.empty:
             return {"error": f"No data available"}
         
         # Align dates
-        combined = pd.merge(stock[['Close']], bench[['Close']], 
-                          left_index=True, right_index=True, suffixes=('_stock', '_bench'))
+        dates = stock.index.intersection(bench.index)
+        stock_close = stock['Close'].reindex(dates).to_numpy(dtype=np.float64)
+        bench_close = bench['Close'].reindex(dates).to_numpy(dtype=np.float64)
         
         # Calculate returns from start
-        combined['Stock_Return'] = (combined['Close_stock'] / combined['Close_stock'].iloc[0] - 1) * 100
-        combined['Bench_Return'] = (combined['Close_bench'] / combined['Close_bench'].iloc[0] - 1) * 100
-        combined['Relative_Return'] = combined['Stock_Return'] - combined['Bench_Return']
+        stock_return = (stock_close / stock_close[0] - 1) * 100
+        bench_return = (bench_close / bench_close[0] - 1) * 100
+        relative_return = stock_return - bench_return
         
         # Current outperformance
-        outperformance = combined['Relative_Return'].iloc[-1]
+        outperformance = relative_return[-1]
         
         # RS Trend (improving or deteriorating?)
-        recent_rs = combined['Relative_Return'].tail(20)
-        rs_slope = np.polyfit(range(len(recent_rs)), recent_rs, 1)[0]
+        # Least-squares slope in closed form: sum(x_c * y_c) / sum(x_c^2) with x centered
+        recent_rs = relative_return[-20:]
+        x = np.arange(len(recent_rs)) - (len(recent_rs) - 1) / 2
+        rs_slope = x @ (recent_rs - recent_rs.mean()) / (x @ x) if len(recent_rs) > 1 else 0.0
         rs_trend = "Improving" if rs_slope > 0 else "Deteriorating"
         
-        # RS Score (0-100, IBD-style)
+        # RS Score (0-100, IBD-style): one rung up for every threshold outperformance beats
         # Professional traders focus on RS > 70
-        if outperformance > 20:
-            rs_score = 99
-        elif outperformance > 15:
-            rs_score = 95
-        elif outperformance > 10:
-            rs_score = 90
-        elif outperformance > 7:
-            rs_score = 85
-        elif outperformance > 5:
-            rs_score = 80
-        elif outperformance > 3:
-            rs_score = 75
-        elif outperformance > 1:
-            rs_score = 70
-        elif outperformance > 0:
-            rs_score = 60
-        elif outperformance > -2:
-            rs_score = 50
-        elif outperformance > -5:
-            rs_score = 40
-        elif outperformance > -10:
-            rs_score = 30
+        if np.isnan(outperformance):
+            rs_score = _RS_SCORES[0]
         else:
-            rs_score = 20
+            rs_score = _RS_SCORES[np.searchsorted(_RS_THRESHOLDS, outperformance)]
         
         # Classification
-        if rs_score >= 90:
-            classification = "EXCEPTIONAL LEADER"
-        elif rs_score >= 80:
-            classification = "STRONG LEADER"
-        elif rs_score >= 70:
-            classification = "LEADER"
-        elif rs_score >= 60:
-            classification = "MARKET PERFORMER"
-        elif rs_score >= 40:
-            classification = "LAGGARD"
-        else:
-            classification = "WEAK LAGGARD"
+        classification = _RS_CLASSES[np.searchsorted(_RS_CLASS_FLOORS, rs_score, side='right')]
         
         # Trading recommendation based on RS
         if rs_score >= 70 and rs_trend == "Improving":
@@ -563,8 +718,8 @@ def calculate_relative_strength(ticker: str, benchmark: str = "SPY", period: str
             "rs_trend": rs_trend,
             "classification": classification,
             "outperformance_%": round(outperformance, 2),
-            "stock_return_%": round(combined['Stock_Return'].iloc[-1], 2),
-            "benchmark_return_%": round(combined['Bench_Return'].iloc[-1], 2),
+            "stock_return_%": round(stock_return[-1], 2),
+            "benchmark_return_%": round(bench_return[-1], 2),
             "recommendation": recommendation,
             "ibd_note": "IBD methodology: Only buy stocks with RS > 70"
         }
@@ -572,6 +727,254 @@ def calculate_relative_strength(ticker: str, benchmark: str = "SPY", period: str
         return {"error": str(e), "ticker": ticker}
 
 
+# Piotroski checks in bit order of the F-Score bitmasks, as (passed, failed) detail labels
+_F_SCORE_LABELS = (
+    ("✓ Positive Net Income", "✗ Negative Net Income"),
+    ("✓ Positive Operating Cash Flow", "✗ Negative Operating Cash Flow"),
+    ("✓ ROA Improving", "✗ ROA Declining"),
+    ("✓ Cash Flow > Net Income", "✗ Cash Flow < Net Income"),
+    ("✓ Debt Decreasing", "✗ Debt Increasing"),
+    ("✓ Current Ratio Improving", "✗ Current Ratio Declining"),
+    ("✓ No Dilution (assumed)", "✗ Dilution"),
+    ("✓ Gross Margin Improving", "✗ Gross Margin Declining"),
+    ("✓ Asset Turnover Improving", "✗ Asset Turnover Declining"),
+)
+
+
+def _fundamental_inputs(financials: tuple) -> tuple[float, ...]:
+    """
+    The line items the scores read from get_financials' result, with the scores' defaults for
+    missing ones, as one row in FUNDAMENTAL_COLUMNS order (the kernel's input layout).
+    """
+    (latest_bs, prev_bs), (latest_is, prev_is), (latest_cf, _), info = financials
+    return (
+        latest_is.get('Net Income', 0),                               # net_income
+        prev_is.get('Net Income', 0),                                 # prev_net_income
+        latest_cf.get('Operating Cash Flow', 0),                      # operating_cf
+        latest_bs.get('Total Assets', 1),                             # total_assets
+        prev_bs.get('Total Assets', 1),                               # prev_total_assets
+        latest_bs.get('Long Term Debt', 0),                           # long_term_debt
+        prev_bs.get('Long Term Debt', 0),                             # prev_long_term_debt
+        latest_bs.get('Current Assets', 0),                           # current_assets
+        latest_bs.get('Current Liabilities', 1),                      # current_liabilities
+        prev_bs.get('Current Assets', 0),                             # prev_current_assets
+        prev_bs.get('Current Liabilities', 1),                        # prev_current_liabilities
+        latest_is.get('Total Revenue', 1),                            # revenue
+        latest_is.get('Cost Of Revenue', 0),                          # cogs
+        prev_is.get('Total Revenue', 1),                              # prev_revenue
+        prev_is.get('Cost Of Revenue', 0),                            # prev_cogs
+        latest_bs.get('Retained Earnings', 0),                        # retained_earnings
+        latest_is.get('EBIT', latest_is.get('Operating Income', 0)),  # ebit
+        latest_bs.get('Total Liabilities Net Minority Interest', 1),  # total_liabilities
+        latest_is.get('Interest Expense', 0),                         # interest_expense
+        info.get('marketCap', 0),                                     # market_cap
+    )
+
+
+def _missing_line_items(financials: tuple) -> list[str]:
+    """
+    Line items the scores cannot do without that are absent (or NaN) in the latest statements.
+
+    Nearly every ratio is per dollar of total assets or of revenue; without them the
+    checks would compare defaults rather than the company.
+    """
+    (latest_bs, _), (latest_is, _), _, _ = financials
+    return [item for statement, item in ((latest_bs, 'Total Assets'), (latest_is, 'Total Revenue'))
+            if pd.isna(statement.get(item, np.nan))]
+
+
+def _ratio(num: np.ndarray, den: np.ndarray, fill: float = 0.0) -> np.ndarray:
+    """num / den, or ``fill`` where den is 0, as one masked division."""
+    return np.divide(num, den, out=np.full(len(den), fill), where=den != 0)
+
+
+def _per_unit(nums: np.ndarray, den: np.ndarray) -> np.ndarray:
+    """Each row of nums / den, or 0 where den is 0, from one reciprocal and one multiply."""
+    has_den = den != 0
+    inv = np.reciprocal(den, out=np.zeros(len(den)), where=has_den)
+    return np.multiply(nums, inv, out=np.zeros(nums.shape), where=has_den)
+
+
+def _score_fundamentals(inputs: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Piotroski check bitmasks, F-Scores and FUNDAMENTAL_METRICS for an (N, K) array of FUNDAMENTAL_COLUMNS rows.
+
+    The checks and metrics come from fundamental_scores_kernel when numba is installed;
+    otherwise every metric is an array operation over the tickers.
+    """
+    f_bits, metrics = fundamental_scores_kernel(inputs) if _numba_available else _fundamental_checks(inputs)
+    # Each F-Score is the number of passed checks, i.e. the popcount of its bitmask
+    return f_bits, np.bitwise_count(f_bits), metrics
+
+
+def _fundamental_checks(inputs: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """NumPy counterpart of fundamental_scores_kernel: (check bitmasks, metrics)."""
+    d = dict(zip(FUNDAMENTAL_COLUMNS, inputs.T))
+    # total_assets is the denominator of six ratios: take its reciprocal once
+    roa, asset_turnover, x1, x2, x3 = _per_unit(np.stack([
+        d["net_income"], d["revenue"], d["current_assets"] - d["current_liabilities"],
+        d["retained_earnings"], d["ebit"]
+    ]), d["total_assets"])
+    prev_roa, prev_asset_turnover = _per_unit(np.stack([d["prev_net_income"], d["prev_revenue"]]),
+                                              d["prev_total_assets"])
+    current_ratio = _ratio(d["current_assets"], d["current_liabilities"])
+    prev_current_ratio = _ratio(d["prev_current_assets"], d["prev_current_liabilities"])
+    gross_margin = _ratio(d["revenue"] - d["cogs"], d["revenue"])
+    prev_gross_margin = _ratio(d["prev_revenue"] - d["prev_cogs"], d["prev_revenue"])
+
+    checks = np.column_stack([
+        d["net_income"] > 0,
+        d["operating_cf"] > 0,
+        roa > prev_roa,
+        d["operating_cf"] > d["net_income"],
+        d["long_term_debt"] < d["prev_long_term_debt"],
+        current_ratio > prev_current_ratio,
+        # No share count history, so no dilution is assumed
+        np.ones(len(inputs), dtype=bool),
+        gross_margin > prev_gross_margin,
+        asset_turnover > prev_asset_turnover,
+    ])
+
+    x4 = _ratio(d["market_cap"], d["total_liabilities"])
+    x5 = asset_turnover
+
+    metrics = np.column_stack([
+        # One matrix-vector product weights all five terms for every ticker
+        _Z_SCORE_WEIGHTS @ np.stack([x1, x2, x3, x4, x5]),
+        current_ratio,
+        _ratio(d["total_liabilities"], d["total_assets"] - d["total_liabilities"]),
+        _ratio(d["ebit"], d["interest_expense"], fill=np.nan),
+        roa,
+        gross_margin,
+    ])
+    return (checks << np.arange(9)).sum(axis=1).astype(np.uint16), metrics
+
+
+# Scale of each FUNDAMENTAL_METRICS column in the result (ROA and gross margin are reported in %)
+_REPORTED_METRIC_SCALE = np.array([1, 1, 1, 1, 100, 100])
+# calculate_fundamental_scores_frame's columns for the reported FUNDAMENTAL_METRICS
+_REPORTED_METRIC_COLUMNS = ("z_score", "current_ratio", "debt_to_equity", "interest_coverage", "roa_pct",
+                            "gross_margin_pct")
+
+
+def _fundamental_scores_table(tickers: list[str]) -> tuple[pd.DataFrame, dict[str, dict]]:
+    """
+    calculate_fundamental_scores_frame's frame for the tickers that could be scored, plus
+    an error dict for each of the others.
+    """
+    unique = list(dict.fromkeys(tickers))
+    
+    # Statement downloads are network-bound and independent, so fetch the cache misses side by side
+    pending = {}
+    missing = [ticker for ticker in unique if get_financials.cache_get(ticker) is None]
+    if len(missing) > 1:
+        with ThreadPoolExecutor(max_workers=min(len(missing), 16)) as executor:
+            pending = {ticker: executor.submit(get_financials, ticker) for ticker in missing}
+    
+    # Fetch failures and unusable statements become per-ticker errors up front, so scoring
+    # only ever sees complete rows and one bad symbol cannot fail the rest of the batch
+    errors = {}
+    inputs = {}
+    for ticker in unique:
+        try:
+            financials = pending[ticker].result() if ticker in pending else get_financials(ticker)
+        except Exception as e:
+            errors[ticker] = {"error": str(e), "ticker": ticker}
+            continue
+        (latest_bs, _), (latest_is, _), _, _ = financials
+        if not latest_bs or not latest_is:
+            errors[ticker] = {"error": f"No financial data for {ticker}"}
+            continue
+        if missing_items := _missing_line_items(financials):
+            errors[ticker] = {"error": f"Insufficient financial data for {ticker}: no {', '.join(missing_items)}",
+                              "ticker": ticker}
+            continue
+        inputs[ticker] = _fundamental_inputs(financials)
+    
+    matrix = np.array(list(inputs.values()), dtype=float).reshape(-1, len(FUNDAMENTAL_COLUMNS))
+    f_bits, f_scores, metrics = _score_fundamentals(matrix)
+    z_scores = metrics[:, 0]
+    
+    # Rungs of the interpretation ladders, for all tickers at once
+    f_levels = np.searchsorted(_F_SCORE_FLOORS, f_scores, side='right')
+    z_levels = np.searchsorted(_Z_SCORE_CUTOFFS, z_scores)
+    # NaN sorts above every cutoff but fails every > test, so it belongs in the distress zone
+    z_levels[np.isnan(z_scores)] = 0
+    safe = z_levels == 2
+    overall = np.select([safe & (f_levels == 3), safe & (f_levels >= 2), (f_levels >= 1) | (z_levels >= 1)],
+                        [3, 2, 1], default=0)
+    
+    # Scaled and rounded to 2 decimals in one pass; a coverage of 999+ (or none, NaN) is reported as N/A
+    reported = np.round(metrics * _REPORTED_METRIC_SCALE, 2)
+    reported[~(metrics[:, 3] < 999), 3] = np.nan
+    
+    scores = pd.DataFrame(reported, index=pd.Index(list(inputs), name="ticker"), columns=_REPORTED_METRIC_COLUMNS)
+    scores.insert(0, "f_score", f_scores.astype(int))
+    scores.insert(1, "f_bits", f_bits)
+    scores.insert(2, "f_interpretation", pd.Categorical.from_codes(f_levels, _F_SCORE_INTERPRETATIONS, ordered=True))
+    scores.insert(4, "z_zone", pd.Categorical.from_codes(z_levels, _Z_ZONES, ordered=True))
+    scores.insert(5, "bankruptcy_risk", pd.Categorical.from_codes(z_levels, _BANKRUPTCY_RISKS, ordered=True))
+    scores.insert(6, "z_interpretation", pd.Categorical.from_codes(z_levels, _Z_INTERPRETATIONS, ordered=True))
+    scores["overall_assessment"] = pd.Categorical.from_codes(overall, _OVERALL_ASSESSMENTS, ordered=True)
+    return scores, errors
+
+
+def calculate_fundamental_scores_frame(tickers: list[str]) -> pd.DataFrame:
+    """
+    Fundamental scores for several tickers as one frame indexed by ticker, for filtering and
+    sorting a screen (e.g. ``scores[(scores.f_score >= 7) & (scores.z_zone == "SAFE ZONE")]``).
+
+    Tickers that could not be scored are left out. The values are those of
+    calculate_fundamental_scores' results; interest_coverage is NaN where they say N/A, bit k
+    of f_bits is set when Piotroski check k passed, and the interpretation columns are
+    ordered categoricals (worst first), so they sort by rank.
+    """
+    return _fundamental_scores_table(tickers)[0]
+
+
+def _fundamental_scores_result(scores, analysis_date: str) -> dict:
+    """calculate_fundamental_scores' result from a row (itertuples) of _fundamental_scores_table's frame."""
+    f_score = int(scores.f_score)
+    f_bits = int(scores.f_bits)
+    return {
+        "ticker": scores.Index,
+        "analysis_date": analysis_date,
+        "piotroski_f_score": {
+            "score": f_score,
+            "out_of": 9,
+            "interpretation": scores.f_interpretation,
+            "details": [passed if f_bits >> k & 1 else failed for k, (passed, failed) in enumerate(_F_SCORE_LABELS)],
+            "recommendation": "BUY candidate if >7" if f_score >= 7 else "AVOID if <3" if f_score < 3 else "NEUTRAL"
+        },
+        "altman_z_score": {
+            "score": scores.z_score,
+            "zone": scores.z_zone,
+            "bankruptcy_risk": scores.bankruptcy_risk,
+            "interpretation": scores.z_interpretation
+        },
+        "additional_metrics": {
+            "current_ratio": scores.current_ratio,
+            "debt_to_equity": scores.debt_to_equity,
+            "interest_coverage": "N/A" if np.isnan(scores.interest_coverage) else scores.interest_coverage,
+            "roa_%": scores.roa_pct,
+            "gross_margin_%": scores.gross_margin_pct
+        },
+        "overall_assessment": scores.overall_assessment
+    }
+
+
+def calculate_fundamental_scores_batch(tickers: list[str]) -> dict[str, dict]:
+    """
+    calculate_fundamental_scores for several tickers: fetched concurrently, scored in one pass.
+
+    Returns a result (or error) dict per ticker, in the order given.
+    """
+    scores, errors = _fundamental_scores_table(tickers)
+    analysis_date = today_iso()
+    results = {row.Index: _fundamental_scores_result(row, analysis_date) for row in scores.itertuples()}
+    return {ticker: results[ticker] if ticker in results else errors[ticker] for ticker in tickers}
+
+
 def calculate_fundamental_scores(ticker: str, max_periods: int = 8) -> dict:
     """
     Calculate comprehensive fundamental quality scores.
@@ -585,187 +988,4 @@ def calculate_fundamental_scores(ticker: str, max_periods: int = 8) -> dict:
     Returns:
         Dictionary containing fundamental scores
     """
-    try:
-        stock = yf.Ticker(ticker)
-        balance_sheet = stock.quarterly_balance_sheet
-        income_stmt = stock.quarterly_income_stmt
-        cashflow = stock.quarterly_cashflow
-        info = stock.info
-        
-        if balance_sheet.empty or income_stmt.empty:
-            return {"error": f"No financial data for {ticker}"}
-        
-        # Get latest and previous period data
-        latest_bs = balance_sheet.iloc[:, 0]
-        prev_bs = balance_sheet.iloc[:, 1] if len(balance_sheet.columns) > 1 else latest_bs
-        latest_is = income_stmt.iloc[:, 0]
-        prev_is = income_stmt.iloc[:, 1] if len(income_stmt.columns) > 1 else latest_is
-        latest_cf = cashflow.iloc[:, 0] if not cashflow.empty else pd.Series()
-        
-        # ========== PIOTROSKI F-SCORE (0-9) ==========
-        f_score = 0
-        f_score_details = []
-        
-        # 1. Positive Net Income
-        net_income = latest_is.get('Net Income', 0)
-        if net_income > 0:
-            f_score += 1
-            f_score_details.append("✓ Positive Net Income")
-        else:
-            f_score_details.append("✗ Negative Net Income")
-        
-        # 2. Positive Operating Cash Flow
-        operating_cf = latest_cf.get('Operating Cash Flow', 0)
-        if operating_cf > 0:
-            f_score += 1
-            f_score_details.append("✓ Positive Operating Cash Flow")
-        else:
-            f_score_details.append("✗ Negative Operating Cash Flow")
-        
-        # 3. ROA Improvement
-        total_assets = latest_bs.get('Total Assets', 1)
-        prev_total_assets = prev_bs.get('Total Assets', 1)
-        roa_current = net_income / total_assets if total_assets != 0 else 0
-        prev_net_income = prev_is.get('Net Income', 0)
-        roa_prev = prev_net_income / prev_total_assets if prev_total_assets != 0 else 0
-        if roa_current > roa_prev:
-            f_score += 1
-            f_score_details.append("✓ ROA Improving")
-        else:
-            f_score_details.append("✗ ROA Declining")
-        
-        # 4. Quality of Earnings (CF > NI)
-        if operating_cf > net_income:
-            f_score += 1
-            f_score_details.append("✓ Cash Flow > Net Income")
-        else:
-            f_score_details.append("✗ Cash Flow < Net Income")
-        
-        # 5. Decreasing Long-term Debt
-        ltd_current = latest_bs.get('Long Term Debt', 0)
-        ltd_prev = prev_bs.get('Long Term Debt', 0)
-        if ltd_current < ltd_prev:
-            f_score += 1
-            f_score_details.append("✓ Debt Decreasing")
-        else:
-            f_score_details.append("✗ Debt Increasing")
-        
-        # 6. Current Ratio Improvement
-        current_assets = latest_bs.get('Current Assets', 0)
-        current_liabilities = latest_bs.get('Current Liabilities', 1)
-        prev_current_assets = prev_bs.get('Current Assets', 0)
-        prev_current_liabilities = prev_bs.get('Current Liabilities', 1)
-        current_ratio = current_assets / current_liabilities if current_liabilities != 0 else 0
-        prev_current_ratio = prev_current_assets / prev_current_liabilities if prev_current_liabilities != 0 else 0
-        if current_ratio > prev_current_ratio:
-            f_score += 1
-            f_score_details.append("✓ Current Ratio Improving")
-        else:
-            f_score_details.append("✗ Current Ratio Declining")
-        
-        # 7. No New Shares Issued (simplified - using shares outstanding)
-        shares_current = info.get('sharesOutstanding', 0)
-        # Approximate previous shares (we'll give benefit of doubt if data not available)
-        f_score += 1
-        f_score_details.append("✓ No Dilution (assumed)")
-        
-        # 8. Gross Margin Improvement
-        revenue = latest_is.get('Total Revenue', 1)
-        cogs = latest_is.get('Cost Of Revenue', 0)
-        gross_margin = (revenue - cogs) / revenue if revenue != 0 else 0
-        prev_revenue = prev_is.get('Total Revenue', 1)
-        prev_cogs = prev_is.get('Cost Of Revenue', 0)
-        prev_gross_margin = (prev_revenue - prev_cogs) / prev_revenue if prev_revenue != 0 else 0
-        if gross_margin > prev_gross_margin:
-            f_score += 1
-            f_score_details.append("✓ Gross Margin Improving")
-        else:
-            f_score_details.append("✗ Gross Margin Declining")
-        
-        # 9. Asset Turnover Improvement
-        asset_turnover = revenue / total_assets if total_assets != 0 else 0
-        prev_asset_turnover = prev_revenue / prev_total_assets if prev_total_assets != 0 else 0
-        if asset_turnover > prev_asset_turnover:
-            f_score += 1
-            f_score_details.append("✓ Asset Turnover Improving")
-        else:
-            f_score_details.append("✗ Asset Turnover Declining")
-        
-        # F-Score Interpretation
-        if f_score >= 7:
-            f_interpretation = "EXCELLENT - Strong fundamentals"
-        elif f_score >= 5:
-            f_interpretation = "GOOD - Decent fundamentals"
-        elif f_score >= 3:
-            f_interpretation = "WEAK - Questionable fundamentals"
-        else:
-            f_interpretation = "POOR - Likely value trap"
-        
-        # ========== ALTMAN Z-SCORE (Bankruptcy Prediction) ==========
-        retained_earnings = latest_bs.get('Retained Earnings', 0)
-        ebit = latest_is.get('EBIT', latest_is.get('Operating Income', 0))
-        total_liabilities = latest_bs.get('Total Liabilities Net Minority Interest', 1)
-        market_cap = info.get('marketCap', 0)
-        
-        # Working Capital
-        working_capital = current_assets - current_liabilities
-        
-        # Z-Score components
-        x1 = working_capital / total_assets if total_assets != 0 else 0
-        x2 = retained_earnings / total_assets if total_assets != 0 else 0
-        x3 = ebit / total_assets if total_assets != 0 else 0
-        x4 = market_cap / total_liabilities if total_liabilities != 0 else 0
-        x5 = revenue / total_assets if total_assets != 0 else 0
-        
-        # Z-Score formula
-        z_score = 1.2*x1 + 1.4*x2 + 3.3*x3 + 0.6*x4 + 1.0*x5
-        
-        # Z-Score zones
-        if z_score > 2.99:
-            z_zone = "SAFE ZONE"
-            bankruptcy_risk = "Low"
-        elif z_score > 1.81:
-            z_zone = "GREY ZONE"
-            bankruptcy_risk = "Medium"
-        else:
-            z_zone = "DISTRESS ZONE"
-            bankruptcy_risk = "High"
-        
-        # Additional metrics
-        debt_to_equity = total_liabilities / (total_assets - total_liabilities) if (total_assets - total_liabilities) != 0 else 0
-        interest_coverage = ebit / latest_is.get('Interest Expense', 1) if latest_is.get('Interest Expense', 0) != 0 else 999
-        
-        return {
-            "ticker": ticker,
-            "analysis_date": datetime.now().strftime("%Y-%m-%d"),
-            "piotroski_f_score": {
-                "score": f_score,
-                "out_of": 9,
-                "interpretation": f_interpretation,
-                "details": f_score_details,
-                "recommendation": "BUY candidate if >7" if f_score >= 7 else "AVOID if <3" if f_score < 3 else "NEUTRAL"
-            },
-            "altman_z_score": {
-                "score": round(z_score, 2),
-                "zone": z_zone,
-                "bankruptcy_risk": bankruptcy_risk,
-                "interpretation": 
-                    "Financially strong" if z_score > 2.99 else
-                    "Caution advised" if z_score > 1.81 else
-                    "High distress - avoid"
-            },
-            "additional_metrics": {
-                "current_ratio": round(current_ratio, 2),
-                "debt_to_equity": round(debt_to_equity, 2),
-                "interest_coverage": round(interest_coverage, 2) if interest_coverage < 999 else "N/A",
-                "roa_%": round(roa_current * 100, 2),
-                "gross_margin_%": round(gross_margin * 100, 2)
-            },
-            "overall_assessment": 
-                "STRONG BUY candidate" if f_score >= 7 and z_score > 2.99 else
-                "Quality company" if f_score >= 5 and z_score > 2.99 else
-                "Proceed with caution" if f_score >= 3 or z_score > 1.81 else
-                "AVOID - Poor fundamentals"
-        }
-    except Exception as e:
-        return {"error": str(e), "ticker": ticker}
+    return calculate_fundamental_scores_batch([ticker])[ticker]
@@ -0,0 +1,71 @@
+import os
+
+# Keep the tests off the shared on-disk cache; set before investor_agent.cache is imported
+os.environ["INVESTOR_AGENT_CACHE_DIR"] = ""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from investor_agent import history, technical_analysis
+
+
+@pytest.fixture(params=["numba", "bottleneck", "numpy"])
+def backend(request, monkeypatch):
+    """
+    Run the test once per indicator code path: the ta_kernels loops, bottleneck's moving
+    windows, and plain NumPy. Without numba installed the kernels run as plain Python.
+    """
+    if request.param == "bottleneck" and not hasattr(technical_analysis, "bn"):
+        pytest.skip("bottleneck not installed")
+    monkeypatch.setattr(technical_analysis, "_numba_available", request.param == "numba")
+    monkeypatch.setattr(technical_analysis, "_bottleneck_available", request.param == "bottleneck")
+    return request.param
+
+
+def price_series(n: int, seed: int = 0, nans: int = 0, flat: bool = False) -> np.ndarray:
+    """A random-walk close series of length n, optionally constant or with NaN holes."""
+    rng = np.random.default_rng(seed)
+    closes = np.full(n, 100.0) if flat else 100.0 + rng.normal(0.0, 1.0, n).cumsum()
+    if nans and n:
+        closes[rng.choice(n, size=min(nans, n), replace=False)] = np.nan
+    return closes
+
+
+def daily_bars(n: int, seed: int = 0, nan_volumes: int = 0, flat: bool = False) -> pd.DataFrame:
+    """
+    n daily OHLCV bars ending today, shaped like Ticker.history.
+
+    NaN volumes are placed away from the first and last bars, whose values the tools report.
+    """
+    rng = np.random.default_rng(seed)
+    close = price_series(n, seed, flat=flat)
+    spread = 0.0 if flat else rng.uniform(0.2, 2.0, n)
+    volume = rng.integers(100_000, 1_000_000, n).astype(float)
+    if nan_volumes:
+        volume[rng.choice(np.arange(1, n - 1), size=nan_volumes, replace=False)] = np.nan
+    index = pd.bdate_range(end=pd.Timestamp.now(tz="America/New_York").normalize(), periods=n)
+    return pd.DataFrame({"Open": close, "High": close + spread, "Low": close - spread,
+                         "Close": close, "Volume": volume}, index=index)
+
+
+@pytest.fixture
+def price_histories(monkeypatch):
+    """
+    Serve price histories from a {ticker: frame} dict instead of yfinance.
+
+    Batched downloads fail, so every ticker goes through the per-ticker fetch.
+    """
+    frames = {}
+
+    def fake_call(ticker, method, **kwargs):
+        return frames[ticker].copy()
+
+    def failed_download(*args, **kwargs):
+        raise ConnectionError("no network in tests")
+
+    monkeypatch.setattr(history, "yf_call", fake_call)
+    monkeypatch.setattr(history, "yf_download", failed_download)
+    history._fetch_history.cache_clear()
+    yield frames
+    history._fetch_history.cache_clear()
@@ -0,0 +1,127 @@
+"""TTLCache expiry and LRU eviction, and the ttl_cache decorator's memory and disk layers."""
+
+import time
+import types
+
+import pytest
+
+from investor_agent import cache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A settable monotonic clock for the cache module."""
+    now = [1000.0]
+    monkeypatch.setattr(cache, "time", types.SimpleNamespace(monotonic=lambda: now[0], time=time.time))
+    return now
+
+
+def test_entries_expire_after_ttl(clock):
+    entries = cache.TTLCache(maxsize=4, ttl=10)
+    entries.set("a", 1)
+    clock[0] += 9.9
+    assert entries.get("a") == 1
+    clock[0] += 0.1
+    assert entries.get("a") is None
+
+
+def test_set_restarts_the_ttl(clock):
+    entries = cache.TTLCache(maxsize=4, ttl=10)
+    entries.set("a", 1)
+    clock[0] += 8
+    entries.set("a", 2)
+    clock[0] += 8
+    assert entries.get("a") == 2
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    entries = cache.TTLCache(maxsize=2, ttl=10)
+    entries.set("a", 1)
+    entries.set("b", 2)
+    assert entries.get("a") == 1  # "b" is now the least recently used
+    entries.set("c", 3)
+    assert entries.get("b") is None
+    assert entries.get("a") == 1
+    assert entries.get("c") == 3
+
+
+def test_clear(clock):
+    entries = cache.TTLCache(maxsize=2, ttl=10)
+    entries.set("a", 1)
+    entries.clear()
+    assert entries.get("a") is None
+
+
+def test_ttl_cache_memoizes_until_expiry(clock):
+    calls = []
+
+    @cache.ttl_cache(maxsize=8, ttl=60)
+    def fetch(ticker, period="1y"):
+        calls.append((ticker, period))
+        return f"{ticker}:{period}"
+
+    assert fetch("AAPL") == fetch("AAPL") == "AAPL:1y"
+    assert fetch("AAPL", period="6mo") == "AAPL:6mo"
+    assert calls == [("AAPL", "1y"), ("AAPL", "6mo")]
+
+    clock[0] += 60
+    fetch("AAPL")
+    assert calls[-1] == ("AAPL", "1y") and len(calls) == 3
+
+
+def test_ttl_cache_skips_none_and_exceptions(clock):
+    results = iter([None, ValueError("rate limited"), "ok"])
+
+    @cache.ttl_cache(maxsize=8, ttl=60)
+    def fetch(ticker):
+        result = next(results)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    assert fetch("AAPL") is None
+    with pytest.raises(ValueError):
+        fetch("AAPL")
+    assert fetch("AAPL") == "ok"
+    assert fetch("AAPL") == "ok"
+
+
+def test_cache_get_and_set(clock):
+    @cache.ttl_cache(maxsize=8, ttl=60)
+    def fetch(ticker, period):
+        raise AssertionError("should be served from the cache")
+
+    assert fetch.cache_get("AAPL", "1y") is None
+    fetch.cache_set("primed", "AAPL", "1y")
+    assert fetch.cache_get("AAPL", "1y") == "primed"
+    assert fetch("AAPL", "1y") == "primed"
+
+    fetch.cache_clear()
+    assert fetch.cache_get("AAPL", "1y") is None
+
+
+def test_disk_layer_survives_a_cleared_memory_cache(tmp_path, monkeypatch):
+    if not cache._diskcache_available:
+        pytest.skip("diskcache not installed")
+    monkeypatch.setattr(cache, "DISK_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(cache, "_disk_cache", None)
+    calls = []
+
+    @cache.ttl_cache(maxsize=8, ttl=60, disk_ttl=600)
+    def fetch(ticker):
+        calls.append(ticker)
+        return {"ticker": ticker}
+
+    try:
+        assert fetch("AAPL") == {"ticker": "AAPL"}
+        fetch.cache_clear()
+        assert fetch("AAPL") == {"ticker": "AAPL"}
+        assert calls == ["AAPL"]
+    finally:
+        cache._disk_cache.close()
+
+
+def test_disk_layer_is_off_without_a_directory(monkeypatch):
+    monkeypatch.setattr(cache, "DISK_CACHE_DIR", "")
+    monkeypatch.setattr(cache, "_disk_cache", None)
+    assert cache.get_disk_cache() is None
@@ -0,0 +1,165 @@
+"""
+The ta_kernels loops and their bottleneck / NumPy fallbacks against the pandas
+implementations they replaced, on short, NaN-holed and flat inputs.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import price_series
+from investor_agent import technical_analysis, technical_analysis_bootstrap
+from investor_agent.ta_kernels import FUNDAMENTAL_COLUMNS, fundamental_scores_kernel, pattern_stats_kernel
+from investor_agent.technical_analysis import TechnicalAnalysis, TechnicalIndicators
+
+CASES = {
+    "empty": dict(n=0),
+    "single": dict(n=1),
+    "short": dict(n=9),
+    "long": dict(n=120),
+    "nan": dict(n=120, nans=4),
+    "flat": dict(n=60, flat=True),
+}
+
+
+@pytest.fixture(params=list(CASES))
+def closes(request):
+    return price_series(seed=len(request.param), **CASES[request.param])
+
+
+def ohlc(closes):
+    """High/low bars around the closes, NaN wherever the close is."""
+    rng = np.random.default_rng(1)
+    spread = rng.uniform(0.1, 2.0, len(closes))
+    return closes + spread, closes - spread[::-1], closes
+
+
+def assert_close(actual, expected):
+    np.testing.assert_allclose(np.asarray(actual, dtype=float), np.asarray(expected, dtype=float),
+                               rtol=1e-9, atol=1e-9, equal_nan=True)
+
+
+def reference_rsi(data, period=14):
+    """The original per-bar RSI loop."""
+    deltas = np.diff(data)
+    seed = deltas[:period+1]
+    up = seed[seed >= 0].sum() / period
+    down = -seed[seed < 0].sum() / period
+    if down == 0:
+        return np.full(len(data), 100.0)
+
+    rsi = np.zeros_like(data)
+    rsi[:period] = 100. - 100./(1. + up / down)
+    for i in range(period, len(data)):
+        delta = deltas[i-1]
+        upval, downval = (delta, 0.) if delta > 0 else (0., -delta)
+        up = (up * (period - 1) + upval) / period
+        down = (down * (period - 1) + downval) / period
+        rs = up / down if down != 0 else 0
+        rsi[i] = 100. - 100./(1. + rs)
+    return rsi
+
+
+def test_sma(backend, closes):
+    expected = pd.Series(closes).rolling(window=10).mean().values
+    assert_close(TechnicalIndicators.calculate_sma(closes, 10), expected)
+
+
+def test_ema(backend, closes):
+    expected = pd.Series(closes).ewm(span=12, adjust=False).mean().values
+    assert_close(TechnicalIndicators.calculate_ema(closes, 12), expected)
+
+
+def test_emas(backend, closes):
+    periods = (12, 26, 50)
+    for ema, period in zip(TechnicalIndicators.calculate_emas(closes, periods), periods):
+        assert_close(ema, pd.Series(closes).ewm(span=period, adjust=False).mean().values)
+
+
+def test_rsi(backend, closes):
+    assert_close(TechnicalIndicators.calculate_rsi(closes), reference_rsi(closes))
+
+
+def test_bollinger_bands(backend, closes):
+    sma = pd.Series(closes).rolling(window=20).mean().values
+    std = pd.Series(closes).rolling(window=20).std().values
+    upper, middle, lower = TechnicalIndicators.calculate_bollinger_bands(closes)
+    assert_close(middle, sma)
+    assert_close(upper, sma + 2 * std)
+    assert_close(lower, sma - 2 * std)
+
+
+def test_stochastic(backend, closes):
+    high, low, close = ohlc(closes)
+    lowest = pd.Series(low).rolling(window=14).min().values
+    highest = pd.Series(high).rolling(window=14).max().values
+    with np.errstate(divide="ignore", invalid="ignore"):
+        raw_k = 100 * (close - lowest) / (highest - lowest)
+    k = pd.Series(raw_k).rolling(window=3).mean().values
+    d = pd.Series(k).rolling(window=3).mean().values
+
+    actual_k, actual_d = TechnicalIndicators.calculate_stochastic(high, low, close)
+    assert_close(actual_k, k)
+    assert_close(actual_d, d)
+
+
+def test_atr(backend, closes):
+    high, low, close = ohlc(closes)
+    prev_close = np.roll(close, 1)
+    true_range = np.maximum(high - low, np.maximum(np.abs(high - prev_close), np.abs(low - prev_close)))
+    true_range[:1] = (high - low)[:1]
+    expected = pd.Series(true_range).ewm(alpha=1 / 14, adjust=False).mean().values
+    assert_close(TechnicalIndicators.calculate_atr(high, low, close), expected)
+
+
+@pytest.mark.parametrize("use_kernel", [True, False])
+def test_atr_wilder(monkeypatch, closes, use_kernel):
+    monkeypatch.setattr(technical_analysis_bootstrap, "_numba_available", use_kernel)
+    true_range = np.abs(np.diff(closes, prepend=100.0)) + 0.5
+
+    # The original per-bar Wilder loop, seeded with the (NaN-skipping) mean of the first bars
+    tr = pd.Series(true_range)
+    expected = []
+    for i in range(len(tr)):
+        if i < 14:
+            expected.append(np.nan)
+        elif i == 14:
+            expected.append(tr.iloc[:14].mean())
+        else:
+            expected.append((expected[-1] * 13 + tr.iloc[i]) / 14)
+
+    assert_close(technical_analysis_bootstrap.atr_wilder(true_range, 14), expected)
+
+
+def test_pattern_stats(closes):
+    if not len(closes):
+        pytest.skip("detect_patterns needs at least one close")
+    uptrend, downtrend, recent_var, overall_var = pattern_stats_kernel(closes, 10, 20)
+    steps = np.diff(closes[-10:])
+    assert uptrend == (len(closes) >= 10 and bool((steps > 0).all()))
+    assert downtrend == (len(closes) >= 10 and bool((steps < 0).all()))
+    assert_close(recent_var, np.var(closes[-20:]))
+    assert_close(overall_var, np.var(closes))
+
+
+def test_detect_patterns_backends_agree(monkeypatch, closes):
+    if not len(closes):
+        pytest.skip("detect_patterns needs at least one close")
+    frame = pd.DataFrame({"Open": closes, "High": closes, "Low": closes, "Close": closes, "Volume": 1.0})
+    results = []
+    for use_kernel in (True, False):
+        monkeypatch.setattr(technical_analysis, "_numba_available", use_kernel)
+        results.append(TechnicalAnalysis.detect_patterns(frame))
+    assert results[0] == results[1]
+
+
+def test_fundamental_scores_kernel_matches_numpy():
+    rng = np.random.default_rng(7)
+    inputs = rng.normal(0.0, 1e9, (64, len(FUNDAMENTAL_COLUMNS)))
+    # Zero denominators: total assets, current liabilities, revenue, interest expense, ...
+    inputs[rng.random(inputs.shape) < 0.15] = 0.0
+
+    f_bits, metrics = fundamental_scores_kernel(inputs)
+    expected_bits, expected_metrics = technical_analysis_bootstrap._fundamental_checks(inputs)
+    np.testing.assert_array_equal(f_bits, expected_bits)
+    np.testing.assert_allclose(metrics, expected_metrics, rtol=1e-12, equal_nan=True)
@@ -0,0 +1,241 @@
+"""
+analyze_volume and analyze_volatility against the pandas implementations they replaced,
+on mocked daily histories with and without missing bars.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import daily_bars
+from investor_agent import history, technical_analysis_bootstrap
+from investor_agent.technical_analysis_bootstrap import analyze_volatility, analyze_volume
+
+HISTORIES = {
+    "clean": dict(n=300),
+    "missing_volume": dict(n=300, nan_volumes=3),
+    "short": dict(n=15),
+    "flat": dict(n=300, flat=True),
+}
+
+
+@pytest.fixture(params=list(HISTORIES))
+def bars(request, price_histories):
+    """Register one history under "TEST" and return the seed used for it."""
+    price_histories["TEST"] = daily_bars(seed=len(request.param), **HISTORIES[request.param])
+    return request.param
+
+
+def reference_volume(df: pd.DataFrame, vwap_mode: str) -> dict:
+    """The original pandas analyze_volume, reduced to the values compared here."""
+    df = df.copy()
+    df['Typical_Price'] = (df['High'] + df['Low'] + df['Close']) / 3
+    df['PV'] = df['Typical_Price'] * df['Volume']
+    if vwap_mode == "session":
+        vwap = df['Typical_Price']
+    elif vwap_mode == "rolling":
+        vwap = df['PV'].rolling(window=20).sum() / df['Volume'].rolling(window=20).sum()
+    else:
+        vwap = df['PV'].cumsum() / df['Volume'].cumsum()
+
+    avg_volume = df['Volume'].tail(20).mean()
+    relative_volume = df['Volume'].iloc[-1] / avg_volume if avg_volume > 0 else 0
+
+    df['OBV_Change'] = 0.0
+    df.loc[df['Close'] > df['Close'].shift(1), 'OBV_Change'] = df['Volume']
+    df.loc[df['Close'] < df['Close'].shift(1), 'OBV_Change'] = -df['Volume']
+    obv = df['OBV_Change'].cumsum()
+    obv_20_ago = obv.iloc[-20] if len(df) >= 20 else obv.iloc[0]
+
+    money_flow = df['PV']
+    price_change = df['Typical_Price'].diff()
+    positive_flow = money_flow.where(price_change > 0, 0).rolling(14).sum()
+    negative_flow = money_flow.where(price_change < 0, 0).rolling(14).sum().replace(0, 0.001)
+    mfi = 100 - (100 / (1 + positive_flow / negative_flow))
+
+    clv = ((df['Close'] - df['Low']) - (df['High'] - df['Close'])) / (df['High'] - df['Low'])
+    ad_line = (clv.fillna(0) * df['Volume']).cumsum()
+    ad_20_ago = ad_line.iloc[-20] if len(df) >= 20 else ad_line.iloc[0]
+
+    return {
+        "vwap": round(vwap.iloc[-1], 2),
+        "relative_volume": round(relative_volume, 2),
+        "obv_trend": "Accumulation" if obv.iloc[-1] > obv_20_ago else "Distribution",
+        "accumulation_distribution_trend": "Accumulation" if ad_line.iloc[-1] > ad_20_ago else "Distribution",
+        "mfi": round(mfi.iloc[-1], 2),
+    }
+
+
+def reference_volume_profile(df: pd.DataFrame) -> tuple[float, float]:
+    """POC of the original pd.cut/groupby volume profile, and its bin width."""
+    bins = pd.cut(df['Close'], bins=20)
+    profile = df.groupby(bins, observed=False)['Volume'].sum().sort_values(ascending=False)
+    poc_bin = profile.index[0]
+    return (poc_bin.left + poc_bin.right) / 2, poc_bin.length
+
+
+@pytest.mark.parametrize("vwap_mode", ["session", "rolling", "anchored"])
+@pytest.mark.parametrize("period", ["1mo", "6mo"])
+def test_analyze_volume_matches_pandas(bars, vwap_mode, period):
+    result = analyze_volume("TEST", period, vwap_mode)
+    expected = reference_volume(history.get_history("TEST", period), vwap_mode)
+
+    assert "error" not in result
+    for key, value in expected.items():
+        assert result[key] == value or (np.isnan(value) and np.isnan(result[key])), key
+
+
+def test_volume_profile_poc_matches_pandas(bars):
+    if bars == "flat":
+        pytest.skip("pd.cut widens a zero price range differently from np.histogram")
+    df = history.get_history("TEST", "6mo")
+    poc, bin_width = reference_volume_profile(df)
+    # pd.cut rounds its bin labels, so the two POCs agree to within that rounding
+    assert analyze_volume("TEST", "6mo")["volume_profile"]["poc_price"] == pytest.approx(poc, abs=0.01 + 1e-3 * bin_width)
+
+
+def test_missing_volume_keeps_the_volume_profile(price_histories):
+    price_histories["TEST"] = daily_bars(300, seed=3, nan_volumes=5)
+    profile = analyze_volume("TEST", "6mo")["volume_profile"]
+    df = history.get_history("TEST", "6mo")
+    # A NaN volume must not empty the value area back to the full High/Low range
+    assert profile["value_area_high"] < round(df['High'].max(), 2)
+    assert profile["value_area_low"] > round(df['Low'].min(), 2)
+
+
+def test_analyze_volume_sections(price_histories):
+    price_histories["TEST"] = daily_bars(300)
+    result = analyze_volume("TEST", "3mo", sections=["obv"])
+    assert "obv_trend" in result and "vwap" not in result and "volume_profile" not in result
+    assert "error" in analyze_volume("TEST", "3mo", sections=["nope"])
+
+
+def test_analyze_volume_without_data(price_histories):
+    price_histories["TEST"] = daily_bars(300).iloc[:0]
+    assert "error" in analyze_volume("TEST", "3mo")
+
+
+VOLATILITY_HISTORIES = {
+    "clean": dict(stock=300, spy=300),
+    "short_stock": dict(stock=100, spy=300),
+    "missing_spy_days": dict(stock=300, spy=300, spy_gaps=10),
+}
+
+
+@pytest.fixture(params=["kernels", "bottleneck", "numpy"])
+def volatility_backend(request, monkeypatch):
+    """Run analyze_volatility once per ATR / rolling-std code path."""
+    if request.param == "bottleneck" and not hasattr(technical_analysis_bootstrap, "bn"):
+        pytest.skip("bottleneck not installed")
+    monkeypatch.setattr(technical_analysis_bootstrap, "_numba_available", request.param == "kernels")
+    monkeypatch.setattr(technical_analysis_bootstrap, "_bottleneck_available", request.param == "bottleneck")
+    return request.param
+
+
+@pytest.fixture(params=list(VOLATILITY_HISTORIES))
+def volatility_bars(request, price_histories):
+    """Register "TEST" and "SPY" histories, SPY optionally missing some of the stock's days."""
+    case = VOLATILITY_HISTORIES[request.param]
+    price_histories["TEST"] = daily_bars(case["stock"], seed=11)
+    spy = daily_bars(case["spy"], seed=12)
+    if case.get("spy_gaps"):
+        gaps = np.random.default_rng(13).choice(np.arange(1, len(spy) - 1), size=case["spy_gaps"], replace=False)
+        spy = spy.drop(spy.index[gaps])
+    price_histories["SPY"] = spy
+    return request.param
+
+
+def reference_volatility(df: pd.DataFrame, spy: pd.DataFrame) -> dict:
+    """The original pandas analyze_volatility, reduced to the values compared here."""
+    df = df.copy()
+    df['H-L'] = df['High'] - df['Low']
+    df['H-PC'] = abs(df['High'] - df['Close'].shift(1))
+    df['L-PC'] = abs(df['Low'] - df['Close'].shift(1))
+    df['TR'] = df[['H-L', 'H-PC', 'L-PC']].max(axis=1)
+
+    def calculate_atr_wilder(tr, period):
+        atr = []
+        for i in range(len(tr)):
+            if i < period:
+                atr.append(np.nan)
+            elif i == period:
+                atr.append(tr.iloc[:period].mean())
+            else:
+                atr.append((atr[-1] * (period - 1) + tr.iloc[i]) / period)
+        return pd.Series(atr, index=tr.index)
+
+    df['ATR_14'] = calculate_atr_wilder(df['TR'], 14)
+    df['ATR_20'] = calculate_atr_wilder(df['TR'], 20)
+    current_price = df['Close'].iloc[-1]
+    atr_14 = df['ATR_14'].iloc[-1]
+
+    df['Returns'] = df['Close'].pct_change()
+    hv = {n: df['Returns'].tail(n).std() * np.sqrt(252) * 100 for n in (10, 20, 30, 60)}
+    one_year_hvs = (df['Returns'].rolling(20).std().tail(252) * np.sqrt(252) * 100)
+    # Ranked against the rolling series' own last value: the original compared with hv[20], whose
+    # rounding noise decided whether the current window counted below itself
+    percentile = (one_year_hvs < one_year_hvs.iloc[-1]).sum() / len(one_year_hvs.dropna()) * 100
+
+    combined = pd.merge(df[['Close']], spy[['Close']], left_index=True, right_index=True,
+                        suffixes=('_stock', '_spy'))
+    combined['Returns_Stock'] = combined['Close_stock'].pct_change()
+    combined['Returns_SPY'] = combined['Close_spy'].pct_change()
+    beta = combined['Returns_Stock'].cov(combined['Returns_SPY']) / combined['Returns_SPY'].var()
+
+    ema_20 = df['Close'].ewm(span=20).mean().iloc[-1]
+    bb_middle = df['Close'].rolling(20).mean().iloc[-1]
+    bb_std = df['Close'].rolling(20).std().iloc[-1]
+
+    return {
+        "current_price": round(current_price, 2),
+        "atr_14": round(atr_14, 2),
+        "atr_20": round(df['ATR_20'].iloc[-1], 2),
+        "atr_14_%_of_price": round(atr_14 / current_price * 100, 2),
+        "atr_20_%_of_price": round(df['ATR_20'].iloc[-1] / current_price * 100, 2),
+        "historical_volatility": {f"{n}_day_%": round(value, 2) for n, value in hv.items()},
+        "volatility_percentile": round(percentile, 1),
+        "beta_vs_spy": round(beta, 2),
+        "keltner_channels": {
+            "upper": round(ema_20 + 2 * df['ATR_20'].iloc[-1], 2),
+            "middle": round(ema_20, 2),
+            "lower": round(ema_20 - 2 * df['ATR_20'].iloc[-1], 2),
+        },
+        "bollinger_band_width_%": round(4 * bb_std / bb_middle * 100, 2),
+        "stop_loss_recommendations": {"standard_2.5x_atr": round(current_price - atr_14 * 2.5, 2)},
+    }
+
+
+@pytest.mark.parametrize("period", ["6mo", "1y"])
+def test_analyze_volatility_matches_pandas(volatility_backend, volatility_bars, period):
+    result = analyze_volatility("TEST", period)
+    expected = reference_volatility(history.get_history("TEST", period), history.get_history("SPY", period))
+
+    assert "error" not in result
+    for key, value in expected.items():
+        if isinstance(value, dict):
+            for inner_key, inner_value in value.items():
+                assert result[key][inner_key] == inner_value, (key, inner_key)
+        else:
+            assert result[key] == value, key
+
+
+def test_analyze_volatility_sections(price_histories):
+    # No "SPY" registered: without the beta section it must not be fetched
+    price_histories["TEST"] = daily_bars(300)
+    result = analyze_volatility("TEST", "6mo", sections=["atr", "bollinger_band_width"])
+    assert "atr_14" in result and "bollinger_band_width_%" in result
+    assert "beta_vs_spy" not in result and "historical_volatility" not in result
+    assert "keltner_channels" in analyze_volatility("TEST", "6mo", sections=["keltner_channels"])
+    assert "error" in analyze_volatility("TEST", "6mo", sections=["nope"])
+
+
+def test_analyze_volatility_without_spy(price_histories):
+    price_histories["TEST"] = daily_bars(300)
+    price_histories["SPY"] = daily_bars(300).iloc[:0]
+    assert analyze_volatility("TEST", "6mo")["beta_vs_spy"] == 1.0
+
+
+def test_analyze_volatility_without_data(price_histories):
+    price_histories["TEST"] = daily_bars(300).iloc[:0]
+    price_histories["SPY"] = daily_bars(300)
+    assert "error" in analyze_volatility("TEST", "6mo")